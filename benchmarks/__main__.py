@@ -0,0 +1,197 @@
+"""
+Benchmarks pique's hot paths against an in-process JSON-RPC node and a fake
+Discord channel. Run from the repository root with `python -m benchmarks`.
+"""
+import asyncio
+import re
+import resource
+import time
+from pathlib import Path
+from typing import List
+
+import click
+
+from benchmarks.fakes import FakeChannel, FakeNode, TOKEN_ADDRESS
+from pique.config import ChainConfig
+from pique.discord.embeds import create_event_embed
+from pique.log import LOGGER
+from pique.providers import close_providers, make_provider
+from pique.ratelimit import TokenBucket
+from pique.scanner.events import _load_config_events
+from pique.scanner.fetcher import make_chain_fetchers
+from pique.scanner.scanner import EventScanner
+from pique.subscriptions import DiscordSubscriber, SubscriptionManager
+
+ABI_FILEPATH = str(
+    Path(__file__).parent.parent / "examples/erc20_transfer/abis/ERC20-Transfer.json"
+)
+BLOCK_NUMBER_FIELD = re.compile(r"^\[(\d+)\]")
+
+
+def _make_events(url: str, chain_id: int = 1):
+    chain_config = ChainConfig.from_dict(chain_id, {"providers": [{"url": url}]})
+    providers = {chain_id: make_provider(chain_config.providers, chain_config)}
+    contracts = [
+        {
+            "name": "Token",
+            "address": TOKEN_ADDRESS,
+            "chain_id": chain_id,
+            "abi_file": ABI_FILEPATH,
+            "events": ["Transfer"],
+        }
+    ]
+    return _load_config_events(contracts, providers=providers), providers
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(name: str, count: int, elapsed: float, unit: str = "events") -> None:
+    rate = count / elapsed if elapsed else float("inf")
+    click.echo(f"{name:<12} {count:>8} {unit} in {elapsed:7.3f}s  {rate:>12,.0f}/s")
+
+
+async def bench_get_logs(url: str, blocks: int, batch_size: int):
+    """Fetches, decodes and timestamps logs through ChainLogFetcher.get_logs."""
+    events, providers = _make_events(url)
+    for container in events:
+        container.latest_scanned_block = 0
+    [fetcher] = make_chain_fetchers(
+        events, rate_limiters={1: TokenBucket(rate=1e9)}, confirmations={}
+    )
+    results = []
+    started = time.perf_counter()
+    for from_block in range(1, blocks + 1, batch_size):
+        to_block = min(from_block + batch_size - 1, blocks)
+        results.extend(await fetcher.get_logs(from_block, to_block))
+    _report("get_logs", len(results), time.perf_counter() - started)
+    await close_providers(providers)
+    return results
+
+
+def bench_embeds(events) -> None:
+    """Builds one Discord embed per event."""
+    started = time.perf_counter()
+    for event in events:
+        create_event_embed(event)
+    _report("embeds", len(events), time.perf_counter() - started, unit="embeds")
+
+
+async def bench_pipeline(
+    node: FakeNode,
+    url: str,
+    blocks: int,
+    block_time: float,
+    batch_size: int,
+    concurrency: int,
+    loop_interval: float,
+    send_latency: float,
+) -> None:
+    """
+    Runs EventScanner and SubscriptionManager end to end while the node mines
+    blocks, measuring the delay from a block being mined to its embed being sent.
+    """
+    events, providers = _make_events(url)
+    queue = asyncio.Queue()
+    scanner = EventScanner(
+        events=events,
+        providers=providers,
+        batch_size=batch_size,
+        start_block="latest",
+        loop_interval=loop_interval,
+        concurrency=concurrency,
+        rate_limit=100000,
+        queue=queue,
+    )
+    channel = FakeChannel(latency=send_latency)
+    subscriber = DiscordSubscriber(
+        channel_id=0, channel=channel, name="benchmark", description=""
+    )
+    manager = SubscriptionManager(event_queue=queue, subscribers=[subscriber])
+    for event in events:
+        manager.subscribe(event=event, subscriber=subscriber)
+
+    manager.start()
+    scanner.start()
+    await asyncio.sleep(loop_interval)
+
+    expected = blocks * node.density
+    started = time.perf_counter()
+    for _ in range(blocks):
+        node.mine()
+        await asyncio.sleep(block_time)
+    while channel.embeds_sent < expected:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    for sent_at, embeds in channel.sends:
+        for embed in embeds:
+            field = next(f for f in embed.fields if f.name == "Block Number")
+            block_number = int(BLOCK_NUMBER_FIELD.match(field.value).group(1))
+            latencies.append(sent_at - node.mined_at[block_number])
+
+    _report("pipeline", channel.embeds_sent, elapsed)
+    click.echo(
+        f"{'latency':<12} p50 {_percentile(latencies, 50) * 1000:8.1f} ms  "
+        f"p95 {_percentile(latencies, 95) * 1000:8.1f} ms  "
+        f"p99 {_percentile(latencies, 99) * 1000:8.1f} ms  "
+        f"({len(channel.sends)} messages)"
+    )
+    await close_providers(providers)
+
+
+async def run(
+    blocks: int,
+    density: int,
+    rpc_latency: float,
+    block_time: float,
+    batch_size: int,
+    concurrency: int,
+    loop_interval: float,
+    send_latency: float,
+) -> None:
+    node = FakeNode(head=blocks, density=density, latency=rpc_latency)
+    url = await node.start()
+    try:
+        events = await bench_get_logs(url, blocks=blocks, batch_size=batch_size)
+        bench_embeds(events)
+        del events
+        await bench_pipeline(
+            node,
+            url,
+            blocks=blocks,
+            block_time=block_time,
+            batch_size=batch_size,
+            concurrency=concurrency,
+            loop_interval=loop_interval,
+            send_latency=send_latency,
+        )
+    finally:
+        await node.stop()
+
+
+@click.command()
+@click.option("--blocks", default=500, help="Blocks per scenario")
+@click.option("--density", default=10, help="Transfer logs per block")
+@click.option("--rpc-latency", default=0.0, help="Seconds added to each RPC call")
+@click.option("--block-time", default=0.01, help="Seconds between mined blocks")
+@click.option("--batch-size", default=100, help="Initial blocks per eth_getLogs")
+@click.option("--concurrency", default=4, help="In-flight ranges per chain")
+@click.option("--loop-interval", default=0.1, help="Seconds between scan rounds")
+@click.option("--send-latency", default=0.0, help="Seconds per Discord send")
+def benchmark(**options):
+    LOGGER.setLevel("ERROR")
+    click.echo(", ".join(f"{key}={value}" for key, value in options.items()))
+    asyncio.run(run(**options))
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    click.echo(f"{'peak rss':<12} {peak_rss:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from eth_utils import keccak
+
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+TOKEN_ADDRESS = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+GENESIS_TIMESTAMP = 1700000000
+
+
+def _block_hash(block_number: int) -> str:
+    return "0x" + keccak(block_number.to_bytes(8, "big")).hex()
+
+
+def _topic_address(seed: int) -> str:
+    return "0x" + "00" * 12 + keccak(seed.to_bytes(8, "big"))[:20].hex()
+
+
+class FakeNode:
+    """
+    In-process JSON-RPC node serving synthetic ERC20 Transfer logs.
+
+    Every block holds `density` Transfer logs of `address`; each request is
+    delayed by `latency` seconds. `mine` advances the head and records when
+    each block appeared, for end-to-end latency measurements.
+    """
+
+    def __init__(
+        self,
+        head: int = 1000,
+        density: int = 10,
+        latency: float = 0,
+        chain_id: int = 1,
+        address: str = TOKEN_ADDRESS,
+    ):
+        self.head = head
+        self.density = density
+        self.latency = latency
+        self.chain_id = chain_id
+        self.address = address
+        self.requests: Dict[str, int] = {}
+        self.mined_at: Dict[int, float] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def mine(self, blocks: int = 1) -> None:
+        now = time.monotonic()
+        for _ in range(blocks):
+            self.head += 1
+            self.mined_at[self.head] = now
+
+    def get_logs(self, from_block: int, to_block: int) -> List[Dict]:
+        logs = []
+        for block_number in range(from_block, min(to_block, self.head) + 1):
+            block_hash = _block_hash(block_number)
+            for log_index in range(self.density):
+                seed = block_number * self.density + log_index
+                logs.append(
+                    {
+                        "address": self.address,
+                        "blockNumber": hex(block_number),
+                        "blockHash": block_hash,
+                        "transactionHash": "0x" + keccak(seed.to_bytes(8, "big")).hex(),
+                        "transactionIndex": hex(log_index),
+                        "logIndex": hex(log_index),
+                        "removed": False,
+                        "topics": [
+                            TRANSFER_TOPIC,
+                            _topic_address(seed),
+                            _topic_address(seed + 1),
+                        ],
+                        "data": "0x" + seed.to_bytes(32, "big").hex(),
+                    }
+                )
+        return logs
+
+    def handle_request(self, request: Dict) -> Dict:
+        method, params = request["method"], request.get("params") or []
+        self.requests[method] = self.requests.get(method, 0) + 1
+        if method == "eth_chainId":
+            result = hex(self.chain_id)
+        elif method == "eth_blockNumber":
+            result = hex(self.head)
+        elif method == "eth_getLogs":
+            log_filter = params[0]
+            result = self.get_logs(
+                int(log_filter["fromBlock"], 16), int(log_filter["toBlock"], 16)
+            )
+        elif method == "eth_getBlockByNumber":
+            tag = params[0]
+            block_number = self.head if tag == "latest" else int(tag, 16)
+            result = {
+                "number": hex(block_number),
+                "hash": _block_hash(block_number),
+                "parentHash": _block_hash(block_number - 1),
+                "timestamp": hex(GENESIS_TIMESTAMP + block_number * 12),
+            }
+        else:
+            error = {"code": -32601, "message": f"method {method} not supported"}
+            return {"jsonrpc": "2.0", "id": request["id"], "error": error}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(body, list):
+            return web.json_response([self.handle_request(r) for r in body])
+        return web.json_response(self.handle_request(body))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}/"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class FakeChannel:
+    """Discord channel stand-in that records what was sent and when."""
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.sends: List[tuple] = []
+
+    def __str__(self):
+        return "fake-channel"
+
+    @property
+    def embeds_sent(self) -> int:
+        return sum(len(embeds) for _, embeds in self.sends)
+
+    async def send(self, embed=None, embeds=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.sends.append((time.monotonic(), embeds or [embed]))
@@ -34,20 +34,6 @@ async def async_lock(lock):
         lock.release()
 
 
-# Function to decode event input arguments
-def decode_event_input(event_signature, log_data, contract_abi, contract):
-    event_abi = None
-    for abi in contract_abi:
-        if abi["type"] == "event" and abi["name"] == event_signature:
-            event_abi = abi
-            break
-
-    if event_abi is None:
-        return None
-
-    return contract.events[event_signature]().processLog({"data": log_data})
-
-
 def bytes_to_hex(output, output_types):
     if isinstance(output, list):
         raise NotImplementedError("List output types not supported yet")
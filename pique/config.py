@@ -1,15 +1,14 @@
 import os
 from pathlib import Path
-from typing import NamedTuple, Set, Dict, List
+from typing import NamedTuple, Set, Dict, List, Optional
 
 import yaml
 from dotenv import load_dotenv
 from jinja2 import Template
-from web3 import Web3
-
 from pique._utils import _read_file, get_infura_url
 from pique.constants import defaults
 from pique.log import LOGGER
+from pique.providers import ProviderRouter, make_provider
 from pique.scanner.events import _load_config_events, EventContainer
 
 
@@ -47,6 +46,8 @@ class DiscordConfig(NamedTuple):
     token: str
     command_prefix: str
     subscribers: List[Dict]
+    batch_size: int
+    batch_wait: float
 
     @classmethod
     def from_dict(cls, config: Dict):
@@ -59,20 +60,72 @@ class DiscordConfig(NamedTuple):
             message = "missing required key in configuration file."
             LOGGER.error(message)
             raise e
-        return cls(token, command_prefix, subscribers)
+        batch_size = discord_config.get("batch_size", defaults.PUBLISH_BATCH_SIZE)
+        batch_wait = discord_config.get("batch_wait", defaults.PUBLISH_BATCH_WAIT)
+        return cls(token, command_prefix, subscribers, batch_size, batch_wait)
+
+
+class ChainConfig(NamedTuple):
+    chain_id: int
+    confirmations: int
+    pool_size: int
+    timeout: float
+    keepalive: float
+    gzip: bool
+    providers: List[Dict]
+    ws_url: Optional[str]
+
+    @classmethod
+    def from_dict(cls, chain_id: int, config: Dict, infura_api_key: str = None):
+        confirmations = config.get("confirmations", defaults.CONFIRMATIONS)
+        pool_size = config.get("pool_size", defaults.POOL_SIZE)
+        timeout = config.get("timeout", defaults.REQUEST_TIMEOUT)
+        keepalive = config.get("keepalive", defaults.KEEPALIVE_TIMEOUT)
+        gzip = config.get("gzip", defaults.GZIP)
+        providers = config.get("providers")
+        if not providers:
+            if not infura_api_key:
+                message = f"no providers or infura key configured for chain #{chain_id}"
+                LOGGER.error(message)
+                raise ValueError(message)
+            providers = [{"url": get_infura_url(int(chain_id), infura_api_key)}]
+        ws_url = config.get("ws_url")
+        return cls(
+            int(chain_id),
+            int(confirmations),
+            int(pool_size),
+            float(timeout),
+            float(keepalive),
+            bool(gzip),
+            providers,
+            ws_url,
+        )
 
 
 class PiqueConfig(NamedTuple):
     name: str
-    infura_api_key: str
+    infura_api_key: Optional[str]
     chain_ids: Set[int]
+    chains: Dict[int, ChainConfig]
     batch_size: int
+    min_batch_size: int
+    max_batch_size: int
     loop_interval: int
     start_block: int
+    concurrency: int
+    rate_limit: float
+    max_backfill: Optional[int]
+    checkpoints: Optional[str]
+    queue_size: int
+    queue_overflow: str
+    dedup_size: int
+    metrics_host: str
+    metrics_port: Optional[int]
     contracts: list
     discord: DiscordConfig
+    subscribers: List[Dict]
     events: List[EventContainer]
-    providers: Dict[int, Web3.HTTPProvider]
+    providers: Dict[int, ProviderRouter]
 
     @classmethod
     def from_file(cls, filepath: str):
@@ -90,20 +143,43 @@ class PiqueConfig(NamedTuple):
             contracts = contracts_config["track"]
             discord = DiscordConfig.from_dict(config)
             name = pique_config["name"]
-            infura_api_key = contracts_config["infura"]
             chain_ids = {contract["chain_id"] for contract in contracts}
         except KeyError as e:
             message = "missing required key in configuration file."
             LOGGER.error(message)
             raise e
 
+        infura_api_key = contracts_config.get("infura")
         batch_size = contracts_config.get("batch_size", defaults.BATCH_SIZE)
+        min_batch_size = contracts_config.get("min_batch_size", defaults.MIN_BATCH_SIZE)
+        max_batch_size = contracts_config.get("max_batch_size", defaults.MAX_BATCH_SIZE)
         loop_interval = contracts_config.get("loop_interval", defaults.LOOP_INTERVAL)
         start_block = contracts_config.get("start_block", defaults.START_BLOCK)
+        concurrency = contracts_config.get("concurrency", defaults.CONCURRENCY)
+        rate_limit = contracts_config.get("rate_limit", defaults.RATE_LIMIT)
+        max_backfill = contracts_config.get("max_backfill", defaults.MAX_BACKFILL)
+        checkpoints = pique_config.get(
+            "checkpoints", defaults.DEFAULT_CHECKPOINTS_FILEPATH
+        )
+        queue_size = pique_config.get("queue_size", defaults.QUEUE_SIZE)
+        queue_overflow = pique_config.get("queue_overflow", defaults.QUEUE_OVERFLOW)
+        dedup_size = pique_config.get("dedup_size", defaults.DEDUP_SIZE)
+        metrics_host = pique_config.get("metrics_host", defaults.METRICS_HOST)
+        metrics_port = pique_config.get("metrics_port", defaults.METRICS_PORT)
+        # webhook, file and stream subscribers
+        subscribers = config.get("subscribers") or []
+
+        chains_config = contracts_config.get("chains") or {}
+        chains = {
+            cid: ChainConfig.from_dict(
+                cid, chains_config.get(cid) or {}, infura_api_key=infura_api_key
+            )
+            for cid in chain_ids
+        }
 
+        # one provider router per chain, shared by the scanner, reads and commands
         providers = {
-            cid: Web3.HTTPProvider(get_infura_url(cid, infura_api_key))
-            for cid in chain_ids
+            cid: make_provider(chains[cid].providers, chains[cid]) for cid in chain_ids
         }
         events = _load_config_events(contracts, providers=providers)
 
@@ -111,11 +187,24 @@ class PiqueConfig(NamedTuple):
             name,
             infura_api_key,
             chain_ids,
+            chains,
             batch_size,
+            min_batch_size,
+            max_batch_size,
             loop_interval,
             start_block,
+            concurrency,
+            rate_limit,
+            max_backfill,
+            checkpoints,
+            queue_size,
+            queue_overflow,
+            dedup_size,
+            metrics_host,
+            metrics_port,
             contracts,
             discord,
+            subscribers,
             events,
             providers,
         )
@@ -1,3 +0,0 @@
-PUBLISHER = 1
-SCANNER = 0.5
-BATCH = 1
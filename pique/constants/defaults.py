@@ -1,7 +1,51 @@
 BATCH_SIZE = 100  # number of blocks to fetch at a time
+MIN_BATCH_SIZE = 1  # lower bound for adaptive batch sizing
+MAX_BATCH_SIZE = 5000  # upper bound for adaptive batch sizing
+SPARSE_RESULTS = 100  # grow the batch size when a range returns fewer logs
 LOOP_INTERVAL = 60  # seconds between each loop
+WS_PING_INTERVAL = 20  # seconds between websocket keep-alive pings
+WS_RECONNECT_DELAY = 5  # seconds before a dropped head subscription reconnects
+CONCURRENCY = 4  # in-flight eth_getLogs requests per chain
+RATE_LIMIT = 10  # RPC requests per second per provider
+POOL_SIZE = 16  # pooled HTTP connections per provider
+REQUEST_TIMEOUT = 30  # seconds before an RPC request is abandoned
+KEEPALIVE_TIMEOUT = 60  # seconds an idle pooled connection is kept open
+DNS_CACHE_TTL = 300  # seconds provider hostnames stay resolved
+GZIP = True  # request gzip-compressed RPC responses
+LATENCY_EWMA_ALPHA = 0.2  # weight of the newest sample in endpoint latency
+CIRCUIT_WINDOW = 20  # recent requests considered for an endpoint's error rate
+CIRCUIT_MIN_REQUESTS = 5  # requests before an endpoint's circuit can open
+CIRCUIT_ERROR_RATE = 0.5  # error rate that opens an endpoint's circuit
+CIRCUIT_COOLDOWN = 30  # seconds before an open circuit is tried again
 EMBED_COLOR = 000000
+DEDUP_SIZE = 50000  # recently seen event ids kept for deduplication
+QUEUE_SIZE = 10000  # events held in memory between scanner and publisher
+QUEUE_OVERFLOW = "block"  # "block" pauses the scanner, "spill" writes to disk
+SUBSCRIBER_QUEUE_SIZE = 1000  # events buffered per subscriber
+DISCORD_MAX_RATELIMIT_TIMEOUT = 30  # longest rate limit wait (s) discord.py sleeps
+PUBLISH_BATCH_SIZE = 10  # events collected before publishing
+PUBLISH_BATCH_WAIT = 1  # seconds to wait for a batch to fill
+DIGEST_WINDOW = 60  # seconds of events summarized per digest
+DIGEST_TOP = 5  # most frequent addresses listed per digest argument
+DIGEST_TOP_CAPACITY_FACTOR = 10  # addresses counted per listed top address
+CONTRACT_READ_CACHE_TTL = 30  # seconds to reuse !contract reads
+CONTRACT_READ_CACHE_SIZE = 256  # cached (address, block) reads
 DEFAULT_CONFIG_FILEPATH = "pique.yml"
 DEFAULT_DOTENV_FILEPATH = ".env"
 START_BLOCK = "latest"  # "latest" or integer
+CONFIRMATIONS = 0  # blocks on top of a block before it is scanned
+REORG_BUFFER_SIZE = 128  # recent block hashes kept for reorg detection
+BLOCK_TIMESTAMP_CACHE_SIZE = 4096  # cached block timestamps per provider
+TIMESTAMP_BATCH_SIZE = 100  # block headers requested per JSON-RPC batch
+MAX_BACKFILL = 50000  # maximum blocks to catch up after a restart
+DEFAULT_CHECKPOINTS_FILEPATH = "pique.db"
 DEFAULT_LOG_LEVEL = "info"
+METRICS_HOST = "127.0.0.1"  # interface serving /metrics
+METRICS_PORT = 9108  # port serving /metrics, null disables it
+RETRY_BACKOFF = 0.5  # base seconds of exponential, jittered retry backoff
+FILE_BUFFER_SIZE = 1 << 20  # bytes buffered by file subscribers
+PARQUET_ROW_GROUP_SIZE = 10000  # events per Parquet row group
+STREAM_NAME = "pique:events"  # stream subscribers XADD to this key
+RETRY_MAX_BACKOFF = 300  # upper bound in seconds of a single retry backoff
+DELIVERY_MAX_RETRIES = 10  # outbox retries of a batch before it is marked failed
+OUTBOX_BATCH_SIZE = 500  # events fanned out per outbox transaction
@@ -0,0 +1,186 @@
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from pique.constants import defaults
+from pique.scanner.events import Event, _jsonable
+
+
+class SpaceSaving:
+    """
+    Approximate top-N counter over an unbounded stream in constant memory
+    (Metwally et al.). Counts are exact for keys that never left the table
+    and overestimated by at most the evicted minimum otherwise.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+
+    def offer(self, key: Hashable) -> None:
+        if key in self.counts:
+            self.counts[key] += 1
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = 1
+        else:
+            evicted = min(self.counts, key=self.counts.get)
+            self.counts[key] = self.counts.pop(evicted) + 1
+
+    def top(self, n: int) -> List[Tuple[Hashable, int]]:
+        return sorted(self.counts.items(), key=lambda item: -item[1])[:n]
+
+
+class NumericStats:
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value: int) -> None:
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+
+def _is_address(value) -> bool:
+    return isinstance(value, str) and len(value) == 42 and value.startswith("0x")
+
+
+class EventDigest:
+    """Streaming aggregates of one contract event over a window."""
+
+    def __init__(self, event: Event, top: int):
+        self.chain_id = event.chain_id
+        self.contract_name = event.contract_name
+        self.contract_address = event.contract_address
+        self.event_type = event.event_type
+        self.description = event.description
+        self.color = event.color
+        self.top_n = top
+        self.opened_at = time.monotonic()
+        self.count = 0
+        self.first_block = event.block_number
+        self.last_block = event.block_number
+        self.last_timestamp = event.timestamp
+        self.numbers: Dict[str, NumericStats] = {}
+        self.addresses: Dict[str, SpaceSaving] = {}
+
+    def add(self, event: Event) -> None:
+        self.count += 1
+        self.first_block = min(self.first_block, event.block_number)
+        self.last_block = max(self.last_block, event.block_number)
+        self.last_timestamp = event.timestamp
+        for name, value in event.args.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                if name not in self.numbers:
+                    self.numbers[name] = NumericStats()
+                self.numbers[name].add(value)
+            elif _is_address(value):
+                if name not in self.addresses:
+                    capacity = self.top_n * defaults.DIGEST_TOP_CAPACITY_FACTOR
+                    self.addresses[name] = SpaceSaving(capacity)
+                self.addresses[name].offer(value)
+
+    def top(self, name: str) -> List[Tuple[str, int]]:
+        return self.addresses[name].top(self.top_n)
+
+    def to_dict(self) -> Dict:
+        """A JSON-serializable view of this digest for non-Discord sinks."""
+        return {
+            "type": "digest",
+            "chain_id": self.chain_id,
+            "contract_name": self.contract_name,
+            "contract_address": self.contract_address,
+            "event": self.event_type,
+            "count": self.count,
+            "first_block": self.first_block,
+            "last_block": self.last_block,
+            "last_timestamp": (
+                self.last_timestamp.isoformat() if self.last_timestamp else None
+            ),
+            "numbers": {
+                name: _jsonable(
+                    {
+                        "count": stats.count,
+                        "total": stats.total,
+                        "min": stats.minimum,
+                        "max": stats.maximum,
+                    }
+                )
+                for name, stats in self.numbers.items()
+            },
+            "top": {name: self.top(name) for name in self.addresses},
+        }
+
+
+class Digester:
+    """
+    Folds events into one EventDigest per (chain, contract, event) and hands
+    them back once `window` seconds have passed since their first event or
+    they hold `max_events` events. Events themselves are never retained.
+    """
+
+    def __init__(
+        self,
+        window: Optional[float] = defaults.DIGEST_WINDOW,
+        max_events: Optional[int] = None,
+        top: int = defaults.DIGEST_TOP,
+        events: Optional[List[str]] = None,
+    ):
+        if window is None and max_events is None:
+            raise ValueError("a digest needs a window, max_events or both")
+        self.window = window
+        self.max_events = max_events
+        self.top = top
+        self.events = set(events) if events else None
+        self.digests: Dict[tuple, EventDigest] = {}
+
+    def __repr__(self):
+        return f"Digester(window={self.window}, max_events={self.max_events})"
+
+    def accepts(self, event: Event) -> bool:
+        return self.events is None or event.event_type in self.events
+
+    def add(self, event: Event) -> Optional[EventDigest]:
+        """Adds an event; returns its digest if that filled the count window."""
+        key = (event.chain_id, event.contract_address, event.event_type)
+        digest = self.digests.get(key)
+        if digest is None:
+            digest = self.digests[key] = EventDigest(event, top=self.top)
+        digest.add(event)
+        if self.max_events is not None and digest.count >= self.max_events:
+            return self.digests.pop(key)
+        return None
+
+    def next_due(self) -> float:
+        """Seconds until the next time window closes."""
+        if not self.digests:
+            return self.window
+        oldest = min(digest.opened_at for digest in self.digests.values())
+        return max(0.0, oldest + self.window - time.monotonic())
+
+    def due(self) -> List[EventDigest]:
+        """Removes and returns the digests whose time window has closed."""
+        if self.window is None:
+            return []
+        now = time.monotonic()
+        expired = [
+            key
+            for key, digest in self.digests.items()
+            if now - digest.opened_at >= self.window
+        ]
+        return [self.digests.pop(key) for key in expired]
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "Digester":
+        return cls(
+            window=config.get("window", defaults.DIGEST_WINDOW),
+            max_events=config.get("max_events"),
+            top=config.get("top", defaults.DIGEST_TOP),
+            events=config.get("events"),
+        )
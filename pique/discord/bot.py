@@ -1,12 +1,34 @@
 import datetime
+from typing import Optional
 
+import aiohttp
 from discord import Intents
 from discord.ext import commands
 
+from pique import metrics
+from pique.constants import defaults
 from pique.discord.embeds import make_status_embed, make_contract_embed
 from pique.log import LOGGER
+from pique.multicall import ContractReader
 from pique.scanner.scanner import EventScanner
-from pique.subscriptions import DiscordSubscriber, SubscriptionManager
+from pique.subscriptions import (
+    DiscordSubscriber,
+    SubscriptionManager,
+    SubscriptionRoute,
+)
+
+
+async def _on_request_end(session, context, params) -> None:
+    if params.response.status == 429:
+        scope = params.response.headers.get("X-RateLimit-Scope", "unknown")
+        metrics.DISCORD_RATE_LIMITS.inc(scope=scope)
+
+
+def _rate_limit_trace() -> aiohttp.TraceConfig:
+    """Counts the 429 responses discord.py handles internally."""
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(_on_request_end)
+    return trace
 
 
 class PiqueCog(commands.Cog):
@@ -22,11 +44,17 @@ class PiqueCog(commands.Cog):
         intents.typing = True
         intents.messages = True
         LOGGER.info(f"Limited intents to {intents}")
-        self.bot = commands.Bot(command_prefix=command_prefix, intents=intents)
+        self.bot = commands.Bot(
+            command_prefix=command_prefix,
+            intents=intents,
+            http_trace=_rate_limit_trace(),
+            max_ratelimit_timeout=defaults.DISCORD_MAX_RATELIMIT_TIMEOUT,
+        )
         self.name = name
         self.__token = token
         self.scanner = event_scanner
         self.subscription_manager = subscription_manager
+        self.contract_reader = ContractReader()
         self.start_time = datetime.datetime.now()
         LOGGER.debug(f"Initialized {self.name}")
 
@@ -64,8 +92,8 @@ class PiqueCog(commands.Cog):
         LOGGER.debug(f"Contract requested by {ctx.author.display_name}")
         try:
             for event in self.scanner.events:
-                LOGGER.debug(f"Checking {event._type.address} == {address}")
-                if event._type.address.lower() == address.lower():
+                LOGGER.debug(f"Checking {event.address} == {address}")
+                if event.address.lower() == address.lower():
                     LOGGER.debug(f"Found contract {address}")
                     break
             else:
@@ -73,18 +101,55 @@ class PiqueCog(commands.Cog):
                 await ctx.send(f"Contract {address} not found")
                 return
 
-            abi = event._type.contract_abi
-            contract = event.w3.eth.contract(address=address, abi=abi)
+            contract = event.contract
         except Exception as e:
             LOGGER.error(f"Error in contract: {e}")
             await ctx.send(f"Error in contract: {e}")
             return
         try:
-            embed = await make_contract_embed(ctx=ctx, contract=contract)
+            # read at the last scanned block so repeated requests hit the cache
+            block_identifier = event.latest_scanned_block or "latest"
+            embed = await make_contract_embed(
+                ctx=ctx,
+                contract=contract,
+                reader=self.contract_reader,
+                block_identifier=block_identifier,
+            )
             await ctx.send(embed=embed)
         except Exception as e:
             LOGGER.error(f"Error in contract: {e}")
 
+    @commands.command()
+    @commands.has_permissions(manage_channels=True)
+    async def subscribe(self, ctx, address: str, event_name: Optional[str] = None):
+        LOGGER.debug(f"Subscribe requested by {ctx.author.display_name}")
+        events = self._find_events(address, event_name)
+        if not events:
+            await ctx.send(f"No tracked events for {address}")
+            return
+        subscriber = self._channel_subscriber(ctx.channel)
+        for event in events:
+            self.subscription_manager.subscribe(event=event, subscriber=subscriber)
+        names = ", ".join(sorted({event.name for event in events}))
+        await ctx.send(f"Subscribed this channel to {names} on {address}")
+
+    @commands.command()
+    @commands.has_permissions(manage_channels=True)
+    async def unsubscribe(self, ctx, address: str, event_name: Optional[str] = None):
+        LOGGER.debug(f"Unsubscribe requested by {ctx.author.display_name}")
+        events = self._find_events(address, event_name)
+        if not events:
+            await ctx.send(f"No tracked events for {address}")
+            return
+        subscriber = self._channel_subscriber(ctx.channel, create=False)
+        if subscriber is None:
+            await ctx.send("This channel has no subscriptions")
+            return
+        for event in events:
+            self.subscription_manager.unsubscribe(event=event, subscriber=subscriber)
+        names = ", ".join(sorted({event.name for event in events}))
+        await ctx.send(f"Unsubscribed this channel from {names} on {address}")
+
     def _connect_subscriber_channels(self):
         for subscriber in self.subscription_manager.subscribers:
 
@@ -98,12 +163,37 @@ class PiqueCog(commands.Cog):
                 LOGGER.error(f"Could not find channel with ID {subscriber.channel_id}")
                 continue
 
-            # set the channel
+            # set the channel; the subscriber was routed when it was loaded
             LOGGER.info(f"Found channel {channel.name} with ID {channel.id}")
             subscriber.channel = channel
 
-            # subscribe to events
-            for event in self.scanner.events:
-                # subscribe to all events by default
-                # TODO: allow for more granular subscription
-                self.subscription_manager.subscribe(event=event, subscriber=subscriber)
+    def _find_events(self, address: str, event_name: Optional[str] = None):
+        return [
+            event
+            for event in self.scanner.events
+            if event.address.lower() == address.lower()
+            and (event_name is None or event.name == event_name)
+        ]
+
+    def _channel_subscriber(
+        self, channel, create: bool = True
+    ) -> Optional[DiscordSubscriber]:
+        """The subscriber posting to a channel, created on first use."""
+        for subscriber in self.subscription_manager.subscribers:
+            if (
+                isinstance(subscriber, DiscordSubscriber)
+                and subscriber.channel_id == channel.id
+            ):
+                return subscriber
+        if not create:
+            return None
+        subscriber = DiscordSubscriber(
+            channel_id=channel.id,
+            channel=channel,
+            name=f"#{channel.name}",
+            description=f"Subscribed from #{channel.name}",
+            # receives only what is subscribed with !subscribe
+            route=SubscriptionRoute(contracts=[]),
+        )
+        self.subscription_manager.add_subscriber(subscriber)
+        return subscriber
@@ -1,13 +1,22 @@
 from collections import defaultdict
+from typing import TYPE_CHECKING, Iterator, List
 
 from discord import Embed
-from web3.contract import Contract
+from web3.contract import AsyncContract
 
+from pique import metrics
 from pique._utils import find_read_functions_without_input
 from pique.constants.networks import NETWORKS
 from pique.log import LOGGER
+from pique.multicall import ContractReader
+
+if TYPE_CHECKING:
+    from pique.digest import EventDigest
+    from pique.scanner.events import Event
 
 MAX_EMBED_CHARS = 1024
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_EMBED_CHARS = 6000
 
 
 def truncate_middle(value: str, max_size: int):
@@ -66,21 +75,33 @@ def format_uptime(raw_uptime):
     )
 
 
-async def make_contract_embed(ctx, contract: Contract):
+def _format_metric(value) -> str:
+    return "n/a" if value is None else f"{value:,.0f}"
+
+
+def _format_ms(seconds) -> str:
+    return "n/a" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+
+async def make_contract_embed(
+    ctx, contract: AsyncContract, reader: ContractReader, block_identifier="latest"
+):
     embed = Embed(
         title=f"Contract",
         description=f"Contract Address: {contract.address}",
         color=000000,
     )
     constant_functions = find_read_functions_without_input(contract.abi)
-    for function_name, details in constant_functions.items():
-        contract_function = getattr(contract.functions, function_name)
-        try:
-            output = contract_function().call()
-        except Exception as e:
-            LOGGER.error(f"Error calling function {function_name}: {e}")
+    outputs = await reader.read(
+        contract, functions=constant_functions, block_identifier=block_identifier
+    )
+    for function_name, output in outputs.items():
+        if isinstance(output, Exception):
+            LOGGER.error(f"Error calling function {function_name}: {output}")
             embed.add_field(
-                name=function_name, value=f"Error calling function: {e}", inline=False
+                name=function_name,
+                value=f"Error calling function: {output}",
+                inline=False,
             )
             continue
         if isinstance(output, bytes):
@@ -102,6 +123,28 @@ async def make_status_embed(w3c, ctx):
     uptime = format_uptime(w3c.uptime)
     embed.add_field(name="Uptime", value=uptime, inline=True)
 
+    queue_depth = metrics.QUEUE_DEPTH.get(queue="events")
+    blocks_behind = metrics.BLOCKS_BEHIND.max()
+    embed.add_field(name="Queue Depth", value=_format_metric(queue_depth), inline=True)
+    embed.add_field(
+        name="Blocks Behind", value=_format_metric(blocks_behind), inline=True
+    )
+    embed.add_field(
+        name="RPC Latency",
+        value=_format_ms(metrics.RPC_LATENCY.mean()),
+        inline=True,
+    )
+    embed.add_field(
+        name="Discord Send",
+        value=_format_ms(metrics.DISCORD_SEND_LATENCY.mean()),
+        inline=True,
+    )
+    embed.add_field(
+        name="Rate Limited",
+        value=_format_metric(metrics.DISCORD_RATE_LIMITS.total()),
+        inline=True,
+    )
+
     contract_events = defaultdict(list)
     for event_type in scanner.events:
         contract_events[event_type.address].append(event_type.name)
@@ -140,6 +183,22 @@ def add_predefined_fields(embed, event, explorer):
     embed.add_field(name="Log Index", value=str(event.log_index), inline=True)
 
 
+def pack_embeds(embeds: List[Embed]) -> Iterator[List[Embed]]:
+    """Groups embeds into chunks that fit in a single Discord message."""
+    chunk, chunk_chars = [], 0
+    for embed in embeds:
+        embed_chars = len(embed)
+        too_many = len(chunk) == MAX_EMBEDS_PER_MESSAGE
+        too_long = chunk_chars + embed_chars > MAX_MESSAGE_EMBED_CHARS
+        if chunk and (too_many or too_long):
+            yield chunk
+            chunk, chunk_chars = [], 0
+        chunk.append(embed)
+        chunk_chars += embed_chars
+    if chunk:
+        yield chunk
+
+
 def create_event_embed(event: "Event"):
     explorer = NETWORKS[event.chain_id]["explorer"]
 
@@ -156,3 +215,58 @@ def create_event_embed(event: "Event"):
 
     LOGGER.debug(f"Created embed for event: {event}")
     return embed
+
+
+def create_retraction_embed(event: "Event"):
+    explorer = NETWORKS[event.chain_id]["explorer"]
+
+    embed = Embed(
+        title=f"Retracted {event.contract_name} {event.event_type} Event",
+        description=(
+            f"A chain reorg orphaned block {event.block_number}; "
+            f"this event is no longer on chain."
+        ),
+        color=event.color,
+        timestamp=event.timestamp or None,
+    )
+    add_predefined_fields(embed, event, explorer)
+    return embed
+
+
+def create_digest_embed(digest: "EventDigest"):
+    explorer = NETWORKS[digest.chain_id]["explorer"]
+    if digest.first_block == digest.last_block:
+        blocks = f"block {digest.first_block}"
+    else:
+        blocks = f"blocks {digest.first_block}-{digest.last_block}"
+    description = f"{digest.count} events in {blocks}"
+    if digest.description:
+        description += f"\n{digest.description}"
+
+    embed = Embed(
+        title=f"{digest.contract_name} {digest.event_type} Digest",
+        description=description,
+        color=digest.color,
+        timestamp=digest.last_timestamp or None,
+    )
+    contract_link = _blockchain_explorer_link(
+        explorer, f"address/{digest.contract_address}", digest.contract_address
+    )
+    embed.add_field(name="Contract Address", value=contract_link, inline=False)
+
+    for name, stats in digest.numbers.items():
+        text = f"sum {stats.total} | min {stats.minimum} | max {stats.maximum}"
+        text = truncate_middle(text, MAX_EMBED_CHARS - 2)
+        embed.add_field(name=name, value=f"`{text}`", inline=False)
+    for name in digest.addresses:
+        text = ""
+        for address, count in digest.top(name):
+            link = _blockchain_explorer_link(explorer, f"address/{address}", address)
+            line = f"{link} × {count}\n"
+            if len(text) + len(line) > MAX_EMBED_CHARS:
+                break
+            text += line
+        embed.add_field(name=f"Top {name}", value=text, inline=False)
+
+    LOGGER.debug(f"Created digest embed for {digest.count} {digest.event_type} events")
+    return embed
@@ -0,0 +1,248 @@
+import bisect
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from pique.constants import defaults
+from pique.log import LOGGER
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+
+    def _key(self, labels: Dict) -> LabelValues:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _format_labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{label}="{value}"' for label, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        return "\n".join(header + self.samples())
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {value}"
+            for key, value in self.values.items()
+        ]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+        self.functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self._key(labels)] = value
+
+    def track(self, function: Callable[[], float], **labels) -> None:
+        """Reads the gauge from `function` whenever it is collected."""
+        self.functions[self._key(labels)] = function
+
+    def collect(self) -> Dict[LabelValues, float]:
+        values = dict(self.values)
+        for key, function in self.functions.items():
+            values[key] = function()
+        return values
+
+    def get(self, **labels) -> Optional[float]:
+        return self.collect().get(self._key(labels))
+
+    def max(self) -> Optional[float]:
+        return max(self.collect().values(), default=None)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {value}"
+            for key, value in self.collect().items()
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self.values: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        if key not in self.values:
+            self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+        series = self.values[key]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def mean(self) -> Optional[float]:
+        """Mean of every observation across all label values."""
+        count = sum(series[2] for series in self.values.values())
+        if not count:
+            return None
+        return sum(series[1] for series in self.values.values()) / count
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = self._format_labels(key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = self._format_labels(key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+RPC_LATENCY = REGISTRY.register(
+    Histogram(
+        "pique_rpc_latency_seconds",
+        "RPC request latency.",
+        labels=("chain_id", "method"),
+    )
+)
+RPC_ERRORS = REGISTRY.register(
+    Counter(
+        "pique_rpc_errors_total",
+        "Failed RPC requests.",
+        labels=("chain_id", "method"),
+    )
+)
+GET_LOGS_RESULTS = REGISTRY.register(
+    Histogram(
+        "pique_get_logs_results",
+        "Logs returned per eth_getLogs range.",
+        labels=("chain_id",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+DECODE_TIME = REGISTRY.register(
+    Histogram(
+        "pique_decode_seconds",
+        "Time spent decoding the logs of one eth_getLogs range.",
+        labels=("chain_id",),
+    )
+)
+EVENTS_SCANNED = REGISTRY.register(
+    Counter(
+        "pique_events_scanned_total",
+        "Events decoded by the scanner.",
+        labels=("chain_id",),
+    )
+)
+BLOCKS_BEHIND = REGISTRY.register(
+    Gauge(
+        "pique_blocks_behind",
+        "Confirmed blocks not yet scanned for a tracked event.",
+        labels=("chain_id", "address", "event"),
+    )
+)
+QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "pique_queue_depth",
+        "Events waiting in a queue.",
+        labels=("queue",),
+    )
+)
+DISCORD_SEND_LATENCY = REGISTRY.register(
+    Histogram(
+        "pique_discord_send_seconds",
+        "Discord message send latency, including rate limit waits.",
+        labels=("subscriber",),
+    )
+)
+DISCORD_RATE_LIMITS = REGISTRY.register(
+    Counter(
+        "pique_discord_rate_limits_total",
+        "Discord API responses with status 429.",
+        labels=("scope",),
+    )
+)
+
+
+class MetricsServer:
+    """Serves the registry on a local `/metrics` endpoint."""
+
+    def __init__(
+        self,
+        host: str = defaults.METRICS_HOST,
+        port: int = defaults.METRICS_PORT,
+        registry: Registry = REGISTRY,
+    ):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.registry.render(), content_type="text/plain")
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        LOGGER.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
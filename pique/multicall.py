@@ -0,0 +1,169 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+import aiohttp
+from eth_abi import decode
+from eth_utils import function_abi_to_4byte_selector
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+from lru import LRU
+from web3.contract import AsyncContract
+
+from pique.constants import defaults
+from pique.log import LOGGER
+from pique.providers import PooledHTTPProvider, ProviderRouter
+from pique.scanner.decoding import make_normalizer
+
+# Multicall3 is deployed at the same address on every supported network
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+
+
+class ContractReadError(Exception):
+    pass
+
+
+def _decode_output(function_abi: Dict, data: bytes) -> Any:
+    outputs = function_abi.get("outputs", [])
+    types = [collapse_if_tuple(o) for o in outputs]
+    values = decode(types, data)
+    values = [make_normalizer(o)(v) for o, v in zip(outputs, values)]
+    if len(values) == 1:
+        return values[0]
+    return values
+
+
+class ContractReader:
+    """
+    Reads every zero-argument view function of a contract in one round trip,
+    through a Multicall3 aggregate3 call with a JSON-RPC batch as fallback.
+    Results are cached per (address, block) for a short time.
+    """
+
+    def __init__(
+        self,
+        ttl: float = defaults.CONTRACT_READ_CACHE_TTL,
+        cache_size: int = defaults.CONTRACT_READ_CACHE_SIZE,
+    ):
+        self.ttl = ttl
+        self._cache = LRU(cache_size)
+
+    async def read(
+        self,
+        contract: AsyncContract,
+        functions: Dict[str, Dict],
+        block_identifier="latest",
+    ) -> Dict[str, Any]:
+        """Maps each function name to its output, or to the exception it raised."""
+        key = (contract.address, block_identifier)
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            LOGGER.debug(f"Using cached reads for {contract.address}")
+            return cached[1]
+
+        calls = [
+            (name, function_abi, HexBytes(function_abi_to_4byte_selector(function_abi)))
+            for name, function_abi in functions.items()
+        ]
+        try:
+            raw_results = await self._multicall(contract, calls, block_identifier)
+        except Exception as e:
+            LOGGER.warning(f"Multicall failed, falling back to a batch request: {e}")
+            raw_results = await self._batch_call(contract, calls, block_identifier)
+
+        results = {}
+        for (name, function_abi, _), (success, data) in zip(calls, raw_results):
+            if not success:
+                results[name] = ContractReadError(data)
+                continue
+            try:
+                results[name] = _decode_output(function_abi, data)
+            except Exception as e:
+                results[name] = e
+
+        self._cache[key] = (time.monotonic() + self.ttl, results)
+        return results
+
+    @staticmethod
+    async def _multicall(
+        contract: AsyncContract, calls: List[Tuple], block_identifier
+    ) -> List[Tuple[bool, Any]]:
+        multicall = contract.w3.eth.contract(
+            address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI
+        )
+        aggregate = multicall.functions.aggregate3(
+            [(contract.address, True, data) for _, _, data in calls]
+        )
+        results = await aggregate.call(block_identifier=block_identifier)
+        return [
+            (True, bytes(data)) if success else (False, "execution reverted")
+            for success, data in results
+        ]
+
+    @staticmethod
+    async def _batch_call(
+        contract: AsyncContract, calls: List[Tuple], block_identifier
+    ) -> List[Tuple[bool, Any]]:
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
+        requests = [
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "eth_call",
+                "params": [
+                    {"to": contract.address, "data": data.hex()},
+                    block_identifier,
+                ],
+            }
+            for request_id, (_, _, data) in enumerate(calls)
+        ]
+        provider = contract.w3.provider
+        if isinstance(provider, (PooledHTTPProvider, ProviderRouter)):
+            # reuse the chain's warm connections
+            responses = await provider.post(requests)
+        else:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    provider.endpoint_uri, json=requests
+                ) as response:
+                    response.raise_for_status()
+                    responses = await response.json()
+
+        by_id = {r.get("id"): r for r in responses}
+        results = []
+        for request_id in range(len(calls)):
+            response = by_id.get(request_id, {})
+            if "result" in response:
+                results.append((True, HexBytes(response["result"])))
+            else:
+                error = response.get("error", {}).get("message", "missing response")
+                results.append((False, error))
+        return results
@@ -0,0 +1,240 @@
+import pickle
+import random
+import sqlite3
+import itertools
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pique.constants import defaults
+from pique.log import LOGGER
+from pique.scanner.events import Event
+
+# (sequence number, failed attempts, event)
+PendingDelivery = Tuple[int, int, Event]
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = defaults.RETRY_BACKOFF,
+    cap: float = defaults.RETRY_MAX_BACKOFF,
+) -> float:
+    """Exponential backoff with full jitter for the given retry attempt."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class Outbox(ABC):
+    """
+    Holds fanned-out events until each of their subscribers has delivered
+    them, so deliveries can be retried and resumed after a restart.
+    """
+
+    @abstractmethod
+    def add(self, deliveries: Sequence[Tuple[Event, List[str]]]) -> List[int]:
+        """
+        Stores events with the keys of the subscribers they are owed to and
+        returns their sequence numbers.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def ack(self, subscriber: str, seqs: Sequence[int]) -> None:
+        """Marks events as delivered to a subscriber."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def retry(self, subscriber: str, seqs: Sequence[int], attempts: int) -> None:
+        """Records a failed delivery attempt."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, subscriber: str, seqs: Sequence[int]) -> None:
+        """Gives up on delivering events to a subscriber."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def pending(
+        self, subscriber: str, after_seq: int = 0, limit: Optional[int] = None
+    ) -> List[PendingDelivery]:
+        """
+        Undelivered events of a subscriber, oldest first, from after `after_seq`
+        and at most `limit` of them.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self) -> int:
+        """Undelivered (subscriber, event) pairs."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryOutbox(Outbox):
+    """Holds undelivered events in memory; they are lost on restart."""
+
+    def __init__(self):
+        self._seq = 0
+        self._events: Dict[int, Event] = {}
+        # subscriber -> {seq: failed attempts}, in seq order
+        self._pending: Dict[str, Dict[int, int]] = defaultdict(dict)
+
+    def add(self, deliveries: Sequence[Tuple[Event, List[str]]]) -> List[int]:
+        seqs = []
+        for event, subscribers in deliveries:
+            self._seq += 1
+            self._events[self._seq] = event
+            for subscriber in subscribers:
+                self._pending[subscriber][self._seq] = 0
+            seqs.append(self._seq)
+        return seqs
+
+    def ack(self, subscriber: str, seqs: Sequence[int]) -> None:
+        pending = self._pending[subscriber]
+        for seq in seqs:
+            pending.pop(seq, None)
+            if not any(seq in other for other in self._pending.values()):
+                self._events.pop(seq, None)
+
+    def retry(self, subscriber: str, seqs: Sequence[int], attempts: int) -> None:
+        pending = self._pending[subscriber]
+        for seq in seqs:
+            if seq in pending:
+                pending[seq] = attempts
+
+    def fail(self, subscriber: str, seqs: Sequence[int]) -> None:
+        self.ack(subscriber, seqs)
+
+    def pending(
+        self, subscriber: str, after_seq: int = 0, limit: Optional[int] = None
+    ) -> List[PendingDelivery]:
+        pending = self._pending[subscriber]
+        seqs = itertools.islice((seq for seq in pending if seq > after_seq), limit)
+        return [(seq, pending[seq], self._events[seq]) for seq in seqs]
+
+    def count(self) -> int:
+        return sum(len(seqs) for seqs in self._pending.values())
+
+
+class SQLiteOutbox(Outbox):
+    """
+    Outbox in a SQLite database in WAL mode. Each fan-out batch is one
+    transaction; an event is stored once and deleted once every subscriber
+    it was owed to has delivered it. Deliveries that exhausted their retries
+    are kept, marked as failed, for inspection.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS outbox_events (
+            seq INTEGER PRIMARY KEY,
+            event BLOB NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS outbox_deliveries (
+            subscriber TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_attempt REAL,
+            failed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (subscriber, seq)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS outbox_deliveries_seq ON outbox_deliveries (seq)",
+    )
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._connection = sqlite3.connect(filepath)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL commits stay durable across process crashes without a full fsync
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            for statement in self._SCHEMA:
+                self._connection.execute(statement)
+        row = self._connection.execute("SELECT MAX(seq) FROM outbox_events").fetchone()
+        self._seq = row[0] or 0
+        pending = self.count()
+        if pending:
+            LOGGER.info(f"Resuming {pending} undelivered events from {filepath}")
+
+    def add(self, deliveries: Sequence[Tuple[Event, List[str]]]) -> List[int]:
+        seqs = list(range(self._seq + 1, self._seq + len(deliveries) + 1))
+        events = [
+            (seq, pickle.dumps(event, protocol=pickle.HIGHEST_PROTOCOL))
+            for seq, (event, _) in zip(seqs, deliveries)
+        ]
+        rows = [
+            (subscriber, seq)
+            for seq, (_, subscribers) in zip(seqs, deliveries)
+            for subscriber in subscribers
+        ]
+        with self._connection:  # single transaction
+            self._connection.executemany(
+                "INSERT INTO outbox_events (seq, event) VALUES (?, ?)", events
+            )
+            self._connection.executemany(
+                "INSERT INTO outbox_deliveries (subscriber, seq) VALUES (?, ?)", rows
+            )
+        self._seq += len(deliveries)
+        return seqs
+
+    def ack(self, subscriber: str, seqs: Sequence[int]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM outbox_deliveries WHERE subscriber = ? AND seq = ?",
+                ((subscriber, seq) for seq in seqs),
+            )
+            self._connection.executemany(
+                "DELETE FROM outbox_events WHERE seq = ? AND NOT EXISTS "
+                "(SELECT 1 FROM outbox_deliveries WHERE seq = outbox_events.seq)",
+                ((seq,) for seq in seqs),
+            )
+
+    def retry(self, subscriber: str, seqs: Sequence[int], attempts: int) -> None:
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE outbox_deliveries SET attempts = ?, last_attempt = ? "
+                "WHERE subscriber = ? AND seq = ?",
+                ((attempts, now, subscriber, seq) for seq in seqs),
+            )
+
+    def fail(self, subscriber: str, seqs: Sequence[int]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "UPDATE outbox_deliveries SET failed = 1 "
+                "WHERE subscriber = ? AND seq = ?",
+                ((subscriber, seq) for seq in seqs),
+            )
+
+    def pending(
+        self, subscriber: str, after_seq: int = 0, limit: Optional[int] = None
+    ) -> List[PendingDelivery]:
+        rows = self._connection.execute(
+            "SELECT d.seq, d.attempts, e.event FROM outbox_deliveries d "
+            "JOIN outbox_events e ON e.seq = d.seq "
+            "WHERE d.subscriber = ? AND d.failed = 0 AND d.seq > ? "
+            "ORDER BY d.seq LIMIT ?",
+            (subscriber, after_seq, -1 if limit is None else limit),
+        ).fetchall()
+        return [(seq, attempts, pickle.loads(event)) for seq, attempts, event in rows]
+
+    def count(self) -> int:
+        row = self._connection.execute(
+            "SELECT COUNT(*) FROM outbox_deliveries WHERE failed = 0"
+        ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def load_outbox(filepath: Optional[str]) -> Outbox:
+    if not filepath:
+        LOGGER.warning("The outbox is disabled; undelivered events are lost on restart")
+        return MemoryOutbox()
+    return SQLiteOutbox(filepath)
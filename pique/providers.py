@@ -0,0 +1,306 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from web3 import AsyncHTTPProvider
+from web3.providers.async_base import AsyncBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from pique.constants import defaults
+from pique import metrics
+from pique.log import LOGGER
+from pique.ratelimit import TokenBucket
+
+# read-only methods that are safe to retry on another endpoint
+_FAILOVER_METHODS = {
+    "eth_blockNumber",
+    "eth_getLogs",
+    "eth_getBlockByNumber",
+    "eth_getBlockByHash",
+    "eth_chainId",
+    "eth_call",
+}
+
+# transport failures that count against an endpoint's health
+_ENDPOINT_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
+
+
+class PooledHTTPProvider(AsyncHTTPProvider):
+    """
+    HTTP provider backed by a dedicated, long-lived aiohttp session per chain.
+    Connections are kept alive between scans, so the scanner, contract reads
+    and bot commands reuse warm TLS connections instead of negotiating new ones.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: str,
+        pool_size: int = defaults.POOL_SIZE,
+        timeout: float = defaults.REQUEST_TIMEOUT,
+        keepalive: float = defaults.KEEPALIVE_TIMEOUT,
+        gzip: bool = defaults.GZIP,
+    ):
+        super().__init__(endpoint_uri)
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.keepalive = keepalive
+        self.gzip = gzip
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The pooled session, created on first use inside the running loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=defaults.DNS_CACHE_TTL,
+            )
+            headers = self.get_request_headers()
+            # aiohttp asks for gzip by default, which fails undecompressed
+            headers["Accept-Encoding"] = "gzip, deflate" if self.gzip else "identity"
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=self.timeout,
+                auto_decompress=self.gzip,
+            )
+            LOGGER.debug(
+                f"Opened connection pool of {self.pool_size} for {self.endpoint_uri}"
+            )
+        return self._session
+
+    async def post(self, payload: Any) -> Any:
+        """Posts a JSON-RPC payload (single or batch) and returns the decoded body."""
+        async with self.session.post(self.endpoint_uri, json=payload) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        request_data = self.encode_rpc_request(method, params)
+        async with self.session.post(self.endpoint_uri, data=request_data) as response:
+            response.raise_for_status()
+            raw_response = await response.read()
+        return self.decode_rpc_response(raw_response)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class Endpoint:
+    """
+    One RPC endpoint behind a ProviderRouter, with its latency EWMA, recent
+    outcomes and circuit breaker state.
+    """
+
+    def __init__(
+        self,
+        provider: PooledHTTPProvider,
+        weight: float = 1,
+        rate_limit: Optional[float] = None,
+    ):
+        self.provider = provider
+        self.weight = weight
+        self.rate_limit = rate_limit
+        self.rate_limiter = TokenBucket(rate=rate_limit) if rate_limit else None
+        self.latency: Optional[float] = None
+        self.outcomes = deque(maxlen=defaults.CIRCUIT_WINDOW)
+        self.opened_at: Optional[float] = None
+        self.head: Optional[int] = None
+
+    def __repr__(self):
+        return f"Endpoint({self.provider.endpoint_uri})"
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    @property
+    def available(self) -> bool:
+        """Closed circuits are available; open ones again once cooled down."""
+        if self.opened_at is None:
+            return True
+        return time.monotonic() - self.opened_at >= defaults.CIRCUIT_COOLDOWN
+
+    @property
+    def score(self) -> float:
+        # lower is better; unmeasured endpoints are tried first
+        return (self.latency or 0) / self.weight
+
+    def record_success(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            alpha = defaults.LATENCY_EWMA_ALPHA
+            self.latency = alpha * latency + (1 - alpha) * self.latency
+        self.outcomes.append(True)
+        if self.opened_at is not None:
+            LOGGER.info(f"Closed circuit for {self.provider.endpoint_uri}")
+            self.opened_at = None
+            self.outcomes.clear()
+
+    def record_failure(self) -> None:
+        self.outcomes.append(False)
+        if self.opened_at is not None:
+            # a failed half-open trial re-opens the circuit
+            self.opened_at = time.monotonic()
+            return
+        if (
+            len(self.outcomes) >= defaults.CIRCUIT_MIN_REQUESTS
+            and self.error_rate >= defaults.CIRCUIT_ERROR_RATE
+        ):
+            LOGGER.warning(
+                f"Opened circuit for {self.provider.endpoint_uri} "
+                f"({self.error_rate:.0%} errors)"
+            )
+            self.opened_at = time.monotonic()
+
+
+class ProviderRouter(AsyncBaseProvider):
+    """
+    Web3 provider that spreads requests over several endpoints of one chain.
+    Healthy endpoints are picked at random in proportion to weight over
+    latency; failed read requests fail over to the next best endpoint.
+    """
+
+    def __init__(self, endpoints: List[Endpoint], chain_id: Optional[int] = None):
+        if not endpoints:
+            raise ValueError("at least one endpoint is required")
+        self.endpoints = endpoints
+        self.chain_id = chain_id
+
+    def __str__(self):
+        return f"ProviderRouter({', '.join(str(e) for e in self.endpoints)})"
+
+    @property
+    def endpoint_uri(self) -> str:
+        return self.endpoints[0].provider.endpoint_uri
+
+    @property
+    def rate_limit(self) -> Optional[float]:
+        """Combined requests per second, if every endpoint is limited."""
+        limits = [e.rate_limit for e in self.endpoints]
+        if None in limits:
+            return None
+        return sum(limits)
+
+    def _candidates(self, min_block: Optional[int] = None) -> List[Endpoint]:
+        endpoints = [e for e in self.endpoints if e.available]
+        if min_block is not None:
+            # avoid endpoints known to lag behind the requested range
+            synced = [e for e in endpoints if e.head is None or e.head >= min_block]
+            endpoints = synced or endpoints
+        if not endpoints:
+            # every circuit is open; try them all rather than stall
+            endpoints = list(self.endpoints)
+        endpoints.sort(key=lambda e: e.score)
+        if len(endpoints) > 1:
+            weights = [e.weight / max(e.latency or 0, 0.001) for e in endpoints]
+            first = random.choices(endpoints, weights=weights)[0]
+            endpoints.remove(first)
+            endpoints.insert(0, first)
+        return endpoints
+
+    async def _request(self, endpoint: Endpoint, call):
+        if endpoint.rate_limiter is not None:
+            await endpoint.rate_limiter.acquire()
+        started = time.monotonic()
+        try:
+            result = await call(endpoint.provider)
+        except _ENDPOINT_ERRORS:
+            endpoint.record_failure()
+            raise
+        endpoint.record_success(time.monotonic() - started)
+        return result
+
+    async def _route(self, call, failover: bool, min_block: Optional[int] = None):
+        candidates = self._candidates(min_block)
+        if not failover:
+            candidates = candidates[:1]
+        for attempt, endpoint in enumerate(candidates, start=1):
+            try:
+                return endpoint, await self._request(endpoint, call)
+            except _ENDPOINT_ERRORS as e:
+                if attempt == len(candidates):
+                    raise
+                LOGGER.warning(f"{endpoint} failed ({e!r}); failing over")
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        min_block = None
+        if method == "eth_getLogs" and params:
+            min_block = _to_block_number(params[0].get("toBlock"))
+        started = time.monotonic()
+        try:
+            endpoint, response = await self._route(
+                lambda provider: provider.make_request(method, params),
+                failover=method in _FAILOVER_METHODS,
+                min_block=min_block,
+            )
+        except Exception:
+            metrics.RPC_ERRORS.inc(chain_id=self.chain_id, method=method)
+            raise
+        metrics.RPC_LATENCY.observe(
+            time.monotonic() - started, chain_id=self.chain_id, method=method
+        )
+        if "error" in response:
+            metrics.RPC_ERRORS.inc(chain_id=self.chain_id, method=method)
+        if method == "eth_blockNumber" and "result" in response:
+            endpoint.head = _to_block_number(response["result"])
+        return response
+
+    async def post(self, payload: Any) -> Any:
+        _, response = await self._route(
+            lambda provider: provider.post(payload), failover=True
+        )
+        return response
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        for endpoint in self.endpoints:
+            if await endpoint.provider.is_connected(show_traceback=show_traceback):
+                return True
+        return False
+
+    async def close(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.provider.close()
+
+
+def _to_block_number(value) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith("0x"):
+        return int(value, 16)
+    return None
+
+
+def make_provider(endpoints: List[Dict], chain_config) -> ProviderRouter:
+    """Builds the router of a chain from its `providers` configuration."""
+    return ProviderRouter(
+        [
+            Endpoint(
+                PooledHTTPProvider(
+                    endpoint["url"],
+                    pool_size=chain_config.pool_size,
+                    timeout=chain_config.timeout,
+                    keepalive=chain_config.keepalive,
+                    gzip=chain_config.gzip,
+                ),
+                weight=float(endpoint.get("weight", 1)),
+                rate_limit=endpoint.get("rate_limit"),
+            )
+            for endpoint in endpoints
+        ],
+        chain_id=chain_config.chain_id,
+    )
+
+
+async def close_providers(providers: Dict[int, AsyncBaseProvider]) -> None:
+    for provider in providers.values():
+        if isinstance(provider, (PooledHTTPProvider, ProviderRouter)):
+            await provider.close()
@@ -0,0 +1,83 @@
+import pickle
+import tempfile
+from asyncio import Queue
+from typing import Optional
+
+from pique.constants import defaults
+from pique.log import LOGGER
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_SPILL = "spill"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_SPILL)
+
+
+class SpillQueue(Queue):
+    """
+    Queue that keeps up to `maxsize` items in memory and spills the overflow,
+    in FIFO order, to a temporary file on disk. Producers never block.
+    """
+
+    def __init__(self, maxsize: int, spill_dir: Optional[str] = None):
+        if maxsize <= 0:
+            # an unbounded queue never spills, and 0 would spill every item
+            raise ValueError("a spilling queue needs a queue_size above zero")
+        self._spill_dir = spill_dir
+        super().__init__(maxsize=maxsize)
+
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        self._spill_file = tempfile.TemporaryFile(dir=self._spill_dir)
+        self._read_offset = 0
+        self._spilled = 0
+
+    def _put(self, item):
+        if self._spilled or len(self._queue) >= self._maxsize:
+            if not self._spilled:
+                LOGGER.warning("Event queue is full; spilling events to disk")
+            self._spill_file.seek(0, 2)
+            pickle.dump(item, self._spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spilled += 1
+        else:
+            self._queue.append(item)
+
+    def _get(self):
+        item = self._queue.popleft()
+        if self._spilled:
+            self._unspill()
+        return item
+
+    def _unspill(self) -> None:
+        # refill memory from the oldest spilled items
+        self._spill_file.seek(self._read_offset)
+        while self._spilled and len(self._queue) < self._maxsize:
+            self._queue.append(pickle.load(self._spill_file))
+            self._spilled -= 1
+        self._read_offset = self._spill_file.tell()
+        if not self._spilled:
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._read_offset = 0
+
+    def qsize(self):
+        return len(self._queue) + self._spilled
+
+    def full(self):
+        return False
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled
+
+
+def make_event_queue(
+    max_size: int = defaults.QUEUE_SIZE,
+    overflow: str = defaults.QUEUE_OVERFLOW,
+) -> Queue:
+    if overflow not in OVERFLOW_POLICIES:
+        raise ValueError(
+            f"unknown queue overflow policy '{overflow}', "
+            f"expected one of {', '.join(OVERFLOW_POLICIES)}"
+        )
+    if overflow == OVERFLOW_SPILL:
+        return SpillQueue(maxsize=max_size)
+    return Queue(maxsize=max_size)
@@ -0,0 +1,99 @@
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pique.log import LOGGER
+
+# (chain_id, address, event name)
+CheckpointKey = Tuple[int, str, str]
+
+
+def checkpoint_key(chain_id: int, address: str, event_name: str) -> CheckpointKey:
+    return int(chain_id), address.lower(), event_name
+
+
+class ScanProgress(NamedTuple):
+    """
+    Queued behind the events of a scanned block range. Its checkpoints and
+    event ids are committed once those events are stored in the outbox, so
+    a crash never skips events that were only held in memory.
+    """
+
+    checkpoints: Dict[CheckpointKey, int]
+    event_ids: List[str]
+
+
+class CheckpointStore(ABC):
+    """Persists the last fully delivered block of each tracked event."""
+
+    @abstractmethod
+    def get(self, key: CheckpointKey) -> Optional[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, checkpoints: Dict[CheckpointKey, int]) -> None:
+        """Atomically stores all given checkpoints."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    def __init__(self):
+        self._checkpoints = {}
+
+    def get(self, key: CheckpointKey) -> Optional[int]:
+        return self._checkpoints.get(key)
+
+    def put(self, checkpoints: Dict[CheckpointKey, int]) -> None:
+        self._checkpoints.update(checkpoints)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            chain_id INTEGER NOT NULL,
+            address TEXT NOT NULL,
+            event TEXT NOT NULL,
+            block_number INTEGER NOT NULL,
+            PRIMARY KEY (chain_id, address, event)
+        )
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._connection = sqlite3.connect(filepath)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(self._SCHEMA)
+        LOGGER.info(f"Using scan checkpoints from {filepath}")
+
+    def get(self, key: CheckpointKey) -> Optional[int]:
+        row = self._connection.execute(
+            "SELECT block_number FROM checkpoints "
+            "WHERE chain_id = ? AND address = ? AND event = ?",
+            key,
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, checkpoints: Dict[CheckpointKey, int]) -> None:
+        rows = [(*key, block) for key, block in checkpoints.items()]
+        with self._connection:  # single transaction
+            self._connection.executemany(
+                "INSERT INTO checkpoints (chain_id, address, event, block_number) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (chain_id, address, event) "
+                "DO UPDATE SET block_number = excluded.block_number",
+                rows,
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def load_checkpoint_store(filepath: Optional[str]) -> CheckpointStore:
+    if not filepath:
+        LOGGER.warning("Scan checkpoints are disabled; restarts will resume from head")
+        return MemoryCheckpointStore()
+    return SQLiteCheckpointStore(filepath)
@@ -0,0 +1,244 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cytoolz import memoize
+from eth_abi import encode
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
+from eth_utils import event_abi_to_log_topic, keccak, to_checksum_address
+from eth_utils.abi import collapse_if_tuple
+from hexbytes import HexBytes
+
+from pique._utils import _read_abi
+
+
+def _is_dynamic(type_str: str) -> bool:
+    # indexed dynamic values are stored as the keccak hash of their encoding
+    return (
+        type_str in ("string", "bytes")
+        or type_str.endswith("]")
+        or type_str.startswith("(")
+    )
+
+
+# hot addresses (routers, exchanges) recur across logs; checksumming hashes each one
+_checksum_address = lru_cache(maxsize=65536)(to_checksum_address)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def make_normalizer(abi_input: Dict) -> Callable[[Any], Any]:
+    """
+    Builds a converter from raw eth-abi values to the shapes web3 returns:
+    checksummed addresses, lists for arrays and named dicts for structs.
+    """
+    type_str = abi_input["type"]
+    if type_str.endswith("]"):
+        item_input = dict(abi_input, type=type_str[: type_str.rindex("[")])
+        normalize_item = make_normalizer(item_input)
+        return lambda value: [normalize_item(item) for item in value]
+    if type_str == "tuple":
+        components = abi_input["components"]
+        names = [c["name"] for c in components]
+        normalizers = [make_normalizer(c) for c in components]
+        return lambda value: {
+            name: normalize(item)
+            for name, normalize, item in zip(names, normalizers, value)
+        }
+    if type_str == "address":
+        return _checksum_address
+    return _identity
+
+
+class EventDecoder:
+    """
+    Decoder for a single event ABI with the eth-abi decoders and the
+    indexed-topic layout resolved up front, so decoding a log is a table
+    lookup and one tuple decode rather than a pass through web3's processLog.
+    """
+
+    def __init__(self, event_abi: Dict):
+        self.abi = event_abi
+        self.name = event_abi["name"]
+        self.topic = HexBytes(event_abi_to_log_topic(event_abi))
+        self.anonymous = event_abi.get("anonymous", False)
+
+        inputs = event_abi["inputs"]
+        self.arg_names = [i["name"] for i in inputs]
+        # (position in args, normalizer, decoder or None for hashed dynamic values)
+        self._topic_layout: List[Tuple[int, Callable, Any]] = []
+        self._data_layout: List[Tuple[int, Callable]] = []
+        data_types = []
+        for position, abi_input in enumerate(inputs):
+            type_str = collapse_if_tuple(abi_input)
+            normalize = make_normalizer(abi_input)
+            if abi_input.get("indexed"):
+                decoder = None
+                if not _is_dynamic(type_str):
+                    decoder = registry.get_decoder(type_str)
+                self._topic_layout.append((position, normalize, decoder))
+            else:
+                self._data_layout.append((position, normalize))
+                data_types.append(type_str)
+        self._data_decoder = TupleDecoder(
+            decoders=[registry.get_decoder(t) for t in data_types]
+        )
+        self._first_topic = 0 if self.anonymous else 1
+
+    def decode_args(self, log) -> Dict[str, Any]:
+        values = [None] * len(self.arg_names)
+
+        topics = log["topics"][self._first_topic :]
+        if len(topics) != len(self._topic_layout):
+            raise ValueError(
+                f"expected {len(self._topic_layout)} indexed topics for {self.name}, "
+                f"got {len(topics)}"
+            )
+        for topic, (position, normalize, decoder) in zip(topics, self._topic_layout):
+            if decoder is None:
+                values[position] = HexBytes(topic)
+            else:
+                value = decoder(ContextFramesBytesIO(HexBytes(topic)))
+                values[position] = normalize(value)
+
+        if self._data_layout:
+            data = self._data_decoder(ContextFramesBytesIO(HexBytes(log["data"])))
+            for (position, normalize), value in zip(self._data_layout, data):
+                values[position] = normalize(value)
+
+        return dict(zip(self.arg_names, values))
+
+    def decode_logs(self, logs) -> List[Dict[str, Any]]:
+        """Decodes the arguments of a batch of raw logs of this event."""
+        decode_args = self.decode_args
+        return [decode_args(log) for log in logs]
+
+
+_TRUE_VALUES = ("true", "1", "yes")
+_FALSE_VALUES = ("false", "0", "no")
+
+
+def _bool_value(value: Any) -> bool:
+    # bool("false") is True, so strings are parsed by their contents
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in _TRUE_VALUES:
+            return True
+        if text in _FALSE_VALUES:
+            return False
+        raise ValueError(f"invalid bool filter value '{value}'")
+    return bool(value)
+
+
+def _filter_value(type_str: str, value: Any) -> Any:
+    """Converts a configured filter value to the type decoded logs carry."""
+    if type_str == "address":
+        return _checksum_address(value)
+    if type_str.startswith(("uint", "int")) and not type_str.endswith("]"):
+        return int(value, 0) if isinstance(value, str) else int(value)
+    if type_str == "bool":
+        return _bool_value(value)
+    if type_str.startswith("bytes"):
+        return HexBytes(value)
+    return value
+
+
+def _hashed_value(value: Any) -> HexBytes:
+    # indexed dynamic values are matched by the hash of their contents
+    data = value.encode() if isinstance(value, str) else bytes(value)
+    return HexBytes(keccak(data))
+
+
+def _topic_value(type_str: str, value: Any) -> str:
+    if _is_dynamic(type_str):
+        return _hashed_value(value).hex()
+    return HexBytes(encode([type_str], [value])).hex()
+
+
+def _filter_values(
+    event_abi: Dict, filters: Dict[str, Any]
+) -> List[Tuple[Dict, List[Any]]]:
+    """Pairs each filtered argument's ABI input with its converted values."""
+    inputs = {i["name"]: i for i in event_abi["inputs"]}
+    compiled = []
+    for name, values in filters.items():
+        if name not in inputs:
+            raise ValueError(f"{event_abi['name']} has no argument named {name}")
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        type_str = collapse_if_tuple(inputs[name])
+        compiled.append((inputs[name], [_filter_value(type_str, v) for v in values]))
+    return compiled
+
+
+def _make_predicate(
+    filter_values: List[Tuple[Dict, List[Any]]]
+) -> Optional[Callable[[Dict], bool]]:
+    if not filter_values:
+        return None
+    allowed = [(i["name"], frozenset(values)) for i, values in filter_values]
+
+    def predicate(args: Dict) -> bool:
+        return all(args[name] in values for name, values in allowed)
+
+    return predicate
+
+
+def compile_predicate(
+    event_abi: Dict, filters: Optional[Dict[str, Any]]
+) -> Optional[Callable[[Dict], bool]]:
+    """Compiles `{arg: value or [values]}` filters into a decoded-args predicate."""
+    if not filters:
+        return None
+    filter_values = [
+        (i, [_hashed_value(v) for v in values])
+        if i.get("indexed") and _is_dynamic(collapse_if_tuple(i))
+        else (i, values)
+        for i, values in _filter_values(event_abi, filters)
+    ]
+    return _make_predicate(filter_values)
+
+
+def compile_filters(
+    event_abi: Dict, filters: Optional[Dict[str, Any]]
+) -> Tuple[Optional[List], Optional[Callable[[Dict], bool]]]:
+    """
+    Compiles `{arg: value or [values]}` filters of one event into the topics of
+    an eth_getLogs call, for indexed args, and a predicate over decoded args,
+    for the rest. Either is None when no filter applies to it.
+    """
+    if not filters:
+        return None, None
+    filter_values = _filter_values(event_abi, filters)
+
+    topic_filters = {
+        abi_input["name"]: [
+            _topic_value(collapse_if_tuple(abi_input), v) for v in values
+        ]
+        for abi_input, values in filter_values
+        if abi_input.get("indexed")
+    }
+    topics = None
+    if topic_filters:
+        indexed = [i for i in event_abi["inputs"] if i.get("indexed")]
+        topics = [HexBytes(event_abi_to_log_topic(event_abi)).hex()]
+        topics += [topic_filters.get(i["name"]) for i in indexed]
+        while topics[-1] is None:
+            topics.pop()
+
+    predicate = _make_predicate(
+        [(i, values) for i, values in filter_values if not i.get("indexed")]
+    )
+    return topics, predicate
+
+
+@memoize
+def load_event_decoders(abi_filepath: str) -> Dict[str, EventDecoder]:
+    """Builds the decoder table of an ABI file once, keyed by event name."""
+    return {
+        abi["name"]: EventDecoder(abi)
+        for abi in _read_abi(abi_filepath)
+        if abi["type"] == "event"
+    }
@@ -0,0 +1,109 @@
+import sqlite3
+import time
+from typing import List, Optional
+
+from lru import LRU
+
+from pique.constants import defaults
+from pique.log import LOGGER
+from pique.scanner.events import Event
+
+
+class SQLiteSeenEventStore:
+    """Persists recently seen event ids so deduplication survives restarts."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS seen_events (
+            id TEXT PRIMARY KEY,
+            seen_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, filepath: str, capacity: int):
+        self.filepath = filepath
+        self.capacity = capacity
+        self._added = 0
+        self._connection = sqlite3.connect(filepath)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        with self._connection:
+            self._connection.execute(self._SCHEMA)
+
+    def load(self) -> List[str]:
+        """Returns the most recently seen ids, oldest first."""
+        rows = self._connection.execute(
+            "SELECT id FROM seen_events ORDER BY seen_at DESC LIMIT ?",
+            (self.capacity,),
+        ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def add(self, event_ids: List[str]) -> None:
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO seen_events (id, seen_at) VALUES (?, ?)",
+                ((event_id, now) for event_id in event_ids),
+            )
+        self._added += len(event_ids)
+        if self._added >= self.capacity // 10:
+            self._prune()
+
+    def _prune(self) -> None:
+        # keep the table bounded to the same size as the in-memory index
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM seen_events WHERE id NOT IN "
+                "(SELECT id FROM seen_events ORDER BY seen_at DESC LIMIT ?)",
+                (self.capacity,),
+            )
+        self._added = 0
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class EventDeduplicator:
+    """
+    Drops events whose id was already seen, using a fixed-size LRU index
+    with an optional persisted backing store.
+    """
+
+    def __init__(
+        self,
+        capacity: int = defaults.DEDUP_SIZE,
+        store: Optional[SQLiteSeenEventStore] = None,
+    ):
+        self._seen = LRU(capacity)
+        self.store = store
+        self.duplicates = 0
+        if store is not None:
+            for event_id in store.load():
+                self._seen[event_id] = None
+            LOGGER.info(f"Loaded {len(self._seen)} seen event ids")
+
+    def __len__(self):
+        return len(self._seen)
+
+    def filter(self, events: List[Event]) -> List[Event]:
+        new_events = []
+        for event in events:
+            event_id = event.id
+            if event_id in self._seen:
+                self.duplicates += 1
+                LOGGER.debug(f"Dropping duplicate event #{event_id[:8]}")
+                continue
+            self._seen[event_id] = None
+            new_events.append(event)
+        return new_events
+
+    def persist(self, event_ids: List[str]) -> None:
+        """Stores seen ids once their events can no longer be lost."""
+        if self.store is not None and event_ids:
+            self.store.add(event_ids)
+
+
+def load_deduplicator(capacity: int, filepath: Optional[str]) -> EventDeduplicator:
+    # persisted alongside the scan checkpoints when those are enabled
+    store = None
+    if filepath:
+        store = SQLiteSeenEventStore(filepath, capacity=capacity)
+    return EventDeduplicator(capacity=capacity, store=store)
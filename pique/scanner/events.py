@@ -1,18 +1,38 @@
-import asyncio
 import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from eth_utils import keccak
+from cytoolz import memoize
+from eth_utils import keccak, to_checksum_address
 from hexbytes import HexBytes
-from web3 import Web3, HTTPProvider
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.contract import AsyncContract
 from web3.datastructures import AttributeDict
 
 from pique._utils import _read_abi
 from pique.constants import defaults
 from pique.log import LOGGER
+from pique.scanner.checkpoints import CheckpointKey, checkpoint_key
+from pique.scanner.decoding import EventDecoder, compile_filters, load_event_decoders
 
 
 class Event:
+    __slots__ = (
+        "contract_name",
+        "color",
+        "description",
+        "chain_id",
+        "event_type",
+        "log_index",
+        "tx_index",
+        "tx_hash",
+        "contract_address",
+        "block_hash",
+        "block_number",
+        "timestamp",
+        "args",
+        "_id",
+    )
+
     def __init__(
         self,
         contract_name: str,
@@ -27,6 +47,7 @@ class Event:
         block_hash: HexBytes,
         block_number: int,
         args: Dict = None,
+        timestamp: Optional[datetime.datetime] = None,
     ):
         self.contract_name = contract_name
         self.color = color
@@ -39,26 +60,43 @@ class Event:
         self.contract_address = contract_address
         self.block_hash = block_hash
         self.block_number = block_number
-        self.timestamp = datetime.datetime.now()
+        self.timestamp = timestamp or datetime.datetime.now()
         self.args = args or {}
+        self._id = None
 
     @property
     def id(self):
-        """Returns a unique ID for this event."""
-        tx_hash = self.tx_hash
-        log_index = self.log_index
-        if isinstance(log_index, int):
-            log_index_bytes = log_index.to_bytes(4, byteorder="big")
-        else:
-            log_index_bytes = log_index
-        concatenated_data = tx_hash + log_index_bytes
-        unique_id = keccak(concatenated_data)
-        return unique_id.hex()
+        """Returns a unique ID for this event, computed once."""
+        if self._id is None:
+            log_index = self.log_index
+            if isinstance(log_index, int):
+                log_index_bytes = log_index.to_bytes(4, byteorder="big")
+            else:
+                log_index_bytes = log_index
+            self._id = keccak(self.tx_hash + log_index_bytes).hex()
+        return self._id
 
     @property
     def name(self):
         return self.event_type
 
+    def to_dict(self) -> Dict:
+        """A JSON-serializable view of this event for non-Discord sinks."""
+        return {
+            "id": self.id,
+            "chain_id": self.chain_id,
+            "contract_name": self.contract_name,
+            "contract_address": self.contract_address,
+            "event": self.event_type,
+            "block_number": self.block_number,
+            "block_hash": HexBytes(self.block_hash).hex(),
+            "tx_hash": HexBytes(self.tx_hash).hex(),
+            "tx_index": self.tx_index,
+            "log_index": self.log_index,
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "args": _jsonable(self.args),
+        }
+
     @classmethod
     def from_dict(cls, _dict: AttributeDict, *args, **kwargs) -> "Event":
         return cls(
@@ -69,55 +107,138 @@ class Event:
             contract_address=_dict["address"],
             block_hash=_dict["blockHash"],
             block_number=_dict["blockNumber"],
-            args=_dict.get("args", {}),  # TODO: use custom arg parser
+            args=dict(_dict.get("args", {})),  # TODO: use custom arg parser
             *args,
             **kwargs,
         )
 
+    @classmethod
+    def from_batch(
+        cls,
+        logs,
+        args: List[Dict],
+        event_type: str,
+        contract_name: str,
+        color: int,
+        description: str,
+        chain_id: int,
+    ) -> List["Event"]:
+        """Builds events for a batch of raw logs and their decoded arguments."""
+        now = datetime.datetime.now()
+        return [
+            cls(
+                contract_name,
+                color,
+                description,
+                chain_id,
+                event_type,
+                log["logIndex"],
+                log["transactionIndex"],
+                log["transactionHash"],
+                log["address"],
+                log["blockHash"],
+                log["blockNumber"],
+                log_args,
+                now,
+            )
+            for log, log_args in zip(logs, args)
+        ]
+
+
+def _jsonable(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        # integers beyond 2**53 lose precision in most JSON consumers
+        return value if abs(value) < 2**53 else str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return HexBytes(value).hex()
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
 
 class EventContainer:
-    def __init__(self, w3_type, contract_name: str, description: str, color: int):
-        self._type = w3_type
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        address: str,
+        abi_filepath: str,
+        decoder: EventDecoder,
+        contract_name: str,
+        description: str,
+        color: int,
+        chain_id: int,
+        filters: Optional[Dict] = None,
+    ):
+        self.w3 = w3
+        self.address = to_checksum_address(address)
+        self.abi_filepath = abi_filepath
+        self.decoder = decoder
+        self.topic = decoder.topic
         self.contract_name = contract_name
         self.description = description
         self.color = color
+        self.chain_id = chain_id
+        self.filters = filters or {}
+        # indexed filters narrow the eth_getLogs topics; the rest are matched
+        # against the decoded arguments
+        self.topics, self.predicate = compile_filters(decoder.abi, filters)
 
-        self.latest_scanned_block = w3_type.w3.eth.block_number
-        self.lock = asyncio.Lock()
-
-    def get_logs(self, *args, **kwargs) -> List[Event]:
-        event_data = self._type.get_logs(*args, **kwargs)
-        events = []
-        for data in event_data:
-            event = Event.from_dict(
-                data,
-                description=self.description,
-                chain_id=self.chain_id,
-                color=self.color,
-                contract_name=self.contract_name,
-            )
-            events.append(event)
-        return events
+        # resolved from the chain head when the scanner first visits this container
+        self.latest_scanned_block = None
 
-    @property
-    def w3(self):
-        return self._type.w3
+    def log_filter(self, from_block: int, to_block: int) -> Dict:
+        return {
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": self.address,
+            "topics": self.topics or [self.topic.hex()],
+        }
+
+    def decode_logs(self, logs) -> List[Event]:
+        """Decodes raw logs already known to belong to this contract event."""
+        args = self.decoder.decode_logs(logs)
+        if self.predicate is not None:
+            matches = [(log, a) for log, a in zip(logs, args) if self.predicate(a)]
+            logs, args = [m[0] for m in matches], [m[1] for m in matches]
+        return Event.from_batch(
+            logs,
+            args=args,
+            event_type=self.name,
+            contract_name=self.contract_name,
+            color=self.color,
+            description=self.description,
+            chain_id=self.chain_id,
+        )
 
     @property
     def name(self):
-        return self._type.abi["name"]
+        return self.decoder.name
 
     @property
     def abi(self):
-        return self._type.abi
+        return self.decoder.abi
+
+    @property
+    def contract_abi(self):
+        return _read_abi(self.abi_filepath)
 
     @property
-    def chain_id(self):
-        return self.w3.eth.chain_id
+    def contract(self) -> AsyncContract:
+        """The web3 contract object, built on first use and shared per contract."""
+        return _make_contract(self.w3, self.address, self.abi_filepath)
 
     @property
-    def address(self):
-        return self._type.address
+    def checkpoint_key(self) -> CheckpointKey:
+        return checkpoint_key(self.chain_id, self.address, self.name)
+
+
+@memoize
+def _make_contract(w3: AsyncWeb3, address: str, abi_filepath: str) -> AsyncContract:
+    return w3.eth.contract(address=address, abi=_read_abi(abi_filepath))
 
 
 def humanize_event(event: Event):
@@ -138,8 +259,14 @@ def log_event(event_instance):
 
 
 def _load_config_events(
-    contracts, providers: Dict[int, HTTPProvider]
+    contracts, providers: Dict[int, AsyncHTTPProvider]
 ) -> List[EventContainer]:
+    """
+    Builds event containers from the tracked contracts configuration without
+    touching the network. Web3 instances are shared per chain; web3 contract
+    objects are only built when a command needs one.
+    """
+    web3_instances = {}
     events = list()
     for contract in contracts:
         # Read contract data from config
@@ -150,17 +277,31 @@ def _load_config_events(
         abi_filepath = contract["abi_file"]
         description = contract.get("description", "")
         color = contract.get("color", defaults.EMBED_COLOR)
-        event_abi = _read_abi(abi_filepath)
+        decoders = load_event_decoders(abi_filepath)
+
+        # Create (or reuse) the web3 instance for this chain
+        if chain_id not in web3_instances:
+            web3_instances[chain_id] = AsyncWeb3(providers[chain_id])
+        w3 = web3_instances[chain_id]
 
-        # Create web3 instance and event container
-        w3 = Web3(providers[chain_id])
-        for name in event_names:
-            contract = w3.eth.contract(address=contract_address, abi=event_abi)
+        for event_config in event_names:
+            # either an event name or {"name": ..., "filters": {...}}
+            if isinstance(event_config, str):
+                name, filters = event_config, None
+            else:
+                name, filters = event_config["name"], event_config.get("filters")
+            if name not in decoders:
+                raise ValueError(f"Event {name} not found in {abi_filepath}")
             event_container = EventContainer(
-                w3_type=contract.events[name](),
+                w3=w3,
+                address=contract_address,
+                abi_filepath=abi_filepath,
+                decoder=decoders[name],
                 description=description,
                 color=color,
                 contract_name=contract_name,
+                chain_id=chain_id,
+                filters=filters,
             )
 
             events.append(event_container)
@@ -0,0 +1,273 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+from web3.exceptions import BlockNotFound
+
+from pique import metrics
+from pique.constants import defaults
+from pique.log import LOGGER
+from pique.ratelimit import TokenBucket
+from pique.scanner.checkpoints import CheckpointKey, CheckpointStore
+from pique.scanner.events import EventContainer, Event
+from pique.scanner.metadata import ProviderMetadata
+from pique.scanner.reorgs import BlockHashBuffer
+
+# error fragments returned by common providers when a range is too large
+_RANGE_ERROR_MESSAGES = (
+    "more than",
+    "too many",
+    "limit exceeded",
+    "response size",
+    "block range",
+    "timeout",
+    "timed out",
+)
+
+
+class ChainLogFetcher:
+    """
+    Fetches the logs of every tracked event on one chain with a single
+    eth_getLogs call per block range and routes each log to the containers
+    that track its (address, topic0) pair. Containers with indexed-argument
+    filters get their own eth_getLogs call with those topics.
+    """
+
+    def __init__(
+        self,
+        chain_id: int,
+        containers: List[EventContainer],
+        rate_limiter: TokenBucket,
+        batch_size: int = defaults.BATCH_SIZE,
+        min_batch_size: int = defaults.MIN_BATCH_SIZE,
+        max_batch_size: int = defaults.MAX_BATCH_SIZE,
+        confirmations: int = defaults.CONFIRMATIONS,
+        reorg_buffer_size: int = defaults.REORG_BUFFER_SIZE,
+    ):
+        self.chain_id = chain_id
+        self.containers = containers
+        self.rate_limiter = rate_limiter
+        self.metadata = ProviderMetadata(w3=self.w3, rate_limiter=rate_limiter)
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size = max(min_batch_size, min(batch_size, max_batch_size))
+        self.confirmations = confirmations
+        self.recent_blocks = BlockHashBuffer(size=reorg_buffer_size)
+        # published events orphaned by a reorg, by id, with the block a
+        # rescan must reach before they are retracted
+        self.orphaned_events: Dict[str, Tuple[int, Event]] = {}
+        self.lock = asyncio.Lock()
+
+        self.filtered = [c for c in containers if c.topics is not None]
+        merged = [c for c in containers if c.topics is None]
+        self._routes: Dict[Tuple[str, HexBytes], List[EventContainer]]
+        self._routes = defaultdict(list)
+        for container in merged:
+            key = (container.address.lower(), HexBytes(container.topic))
+            self._routes[key].append(container)
+
+        self.addresses = sorted({to_checksum_address(c.address) for c in merged})
+        self.topics = sorted({HexBytes(c.topic).hex() for c in merged})
+
+    def __repr__(self):
+        return (
+            f"ChainLogFetcher(chain_id={self.chain_id}, events={len(self.containers)})"
+        )
+
+    @property
+    def w3(self):
+        # all containers on a chain share the same provider
+        return self.containers[0].w3
+
+    @property
+    def latest_scanned_block(self):
+        blocks = [c.latest_scanned_block for c in self.containers]
+        if None in blocks:
+            return None
+        return min(blocks)
+
+    def initialize(
+        self,
+        latest_block: int,
+        start_block,
+        checkpoints: CheckpointStore,
+        max_backfill: Optional[int],
+    ) -> None:
+        """
+        Resolves where each container resumes scanning: the stored checkpoint,
+        else the configured start block, else the current head. The resulting
+        backfill is bounded to `max_backfill` blocks behind head.
+        """
+        for container in self.containers:
+            if container.latest_scanned_block is not None:
+                continue
+            resume_block = checkpoints.get(container.checkpoint_key)
+            if resume_block is not None:
+                LOGGER.info(f"Resuming {container.name} from block {resume_block}")
+            elif start_block == "latest":
+                resume_block = latest_block
+            else:
+                resume_block = int(start_block) - 1
+
+            if max_backfill is not None and latest_block - resume_block > max_backfill:
+                LOGGER.warning(
+                    f"{container.name}|{container.address[:8]} is "
+                    f"{latest_block - resume_block} blocks behind; "
+                    f"limiting backfill to {max_backfill} blocks"
+                )
+                resume_block = latest_block - max_backfill
+            container.latest_scanned_block = resume_block
+
+    async def get_block_number(self) -> int:
+        await self.rate_limiter.acquire()
+        return await self.w3.eth.block_number
+
+    async def get_safe_block_number(self) -> int:
+        """The most recent block with at least `confirmations` blocks on top."""
+        return await self.get_block_number() - self.confirmations
+
+    async def get_block_hash(self, block_number: int) -> Optional[HexBytes]:
+        await self.rate_limiter.acquire()
+        try:
+            block = await self.w3.eth.get_block(block_number)
+        except BlockNotFound:
+            return None
+        return HexBytes(block["hash"])
+
+    async def verify(self) -> None:
+        """Checks once that the provider serves the configured chain."""
+        await self.metadata.verify_chain_id(expected_chain_id=self.chain_id)
+
+    async def _get_logs(self, log_filter: Dict) -> List:
+        await self.rate_limiter.acquire()
+        logs = await self.w3.eth.get_logs(log_filter)
+        metrics.GET_LOGS_RESULTS.observe(len(logs), chain_id=self.chain_id)
+        return logs
+
+    async def get_logs(self, from_block: int, to_block: int) -> List[Event]:
+        requests = [c.log_filter(from_block, to_block) for c in self.filtered]
+        if self.addresses:
+            merged_filter = {
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": self.addresses,
+                "topics": [self.topics],
+            }
+            requests.append(merged_filter)
+        results = await asyncio.gather(*(self._get_logs(r) for r in requests))
+
+        routed = defaultdict(list)
+        for container, container_logs in zip(self.filtered, results):
+            routed[container].extend(container_logs)
+        merged_logs = results[-1] if self.addresses else []
+        for log in merged_logs:
+            if not log["topics"]:
+                continue
+            key = (log["address"].lower(), HexBytes(log["topics"][0]))
+            containers = self._routes.get(key)
+            if containers is None:
+                LOGGER.debug(f"Skipping untracked log from {log['address']}")
+                continue
+            for container in containers:
+                routed[container].append(log)
+
+        logs = [log for container_logs in results for log in container_logs]
+        if not logs:
+            return []
+        for container, container_logs in routed.items():
+            # drop blocks this container already scanned past
+            routed[container] = [
+                log
+                for log in container_logs
+                if log["blockNumber"] > container.latest_scanned_block
+            ]
+
+        self.metadata.cache_log_timestamps(logs)
+        started = time.perf_counter()
+        events = []
+        for container, container_logs in routed.items():
+            events.extend(container.decode_logs(container_logs))
+        metrics.DECODE_TIME.observe(
+            time.perf_counter() - started, chain_id=self.chain_id
+        )
+        metrics.EVENTS_SCANNED.inc(len(events), chain_id=self.chain_id)
+        events.sort(key=lambda e: (e.block_number, e.log_index))
+
+        timestamps = await self.metadata.get_block_timestamps(
+            e.block_number for e in events
+        )
+        for event in events:
+            event.timestamp = timestamps[event.block_number]
+        return events
+
+    def mark_scanned(self, block_number: int) -> None:
+        for container in self.containers:
+            if block_number > container.latest_scanned_block:
+                container.latest_scanned_block = block_number
+
+    def record_progress(self, latest_block: int) -> None:
+        for container in self.containers:
+            metrics.BLOCKS_BEHIND.set(
+                max(0, latest_block - container.latest_scanned_block),
+                chain_id=self.chain_id,
+                address=container.address,
+                event=container.name,
+            )
+
+    def rewind(self, block_number: int) -> None:
+        for container in self.containers:
+            container.latest_scanned_block = min(
+                container.latest_scanned_block, block_number
+            )
+
+    def shrink_batch_size(self, rejected_size: int) -> None:
+        # relative to the rejected range, so concurrent failures don't compound
+        smaller = min(self.batch_size, rejected_size // 2)
+        self.batch_size = max(self.min_batch_size, smaller)
+        LOGGER.debug(
+            f"Reduced batch size of chain #{self.chain_id} to {self.batch_size}"
+        )
+
+    def grow_batch_size(self, num_results: int) -> None:
+        if num_results >= defaults.SPARSE_RESULTS:
+            return
+        if self.batch_size < self.max_batch_size:
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+            LOGGER.debug(
+                f"Increased batch size of chain #{self.chain_id} to {self.batch_size}"
+            )
+
+    def checkpoints(self) -> Dict[CheckpointKey, int]:
+        return {c.checkpoint_key: c.latest_scanned_block for c in self.containers}
+
+
+def is_range_error(error: Exception) -> bool:
+    """True if the provider rejected a block range as too large or too slow."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    message = str(error).lower()
+    return any(text in message for text in _RANGE_ERROR_MESSAGES)
+
+
+def make_chain_fetchers(
+    events: List[EventContainer],
+    rate_limiters: Dict[int, TokenBucket],
+    confirmations: Dict[int, int],
+    **kwargs,
+) -> List[ChainLogFetcher]:
+    containers = defaultdict(list)
+    for event_container in events:
+        containers[event_container.chain_id].append(event_container)
+    return [
+        ChainLogFetcher(
+            chain_id=chain_id,
+            containers=chain_containers,
+            rate_limiter=rate_limiters[chain_id],
+            confirmations=confirmations.get(chain_id, defaults.CONFIRMATIONS),
+            **kwargs,
+        )
+        for chain_id, chain_containers in containers.items()
+    ]
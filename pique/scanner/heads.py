@@ -0,0 +1,53 @@
+import json
+from typing import Callable, Optional
+
+import websockets
+
+from pique.constants import defaults
+from pique.log import LOGGER
+
+
+class NewHeadsSubscription:
+    """
+    Listens for new blocks of one chain over an `eth_subscribe("newHeads")`
+    WebSocket subscription.
+    """
+
+    def __init__(self, chain_id: int, ws_url: str):
+        self.chain_id = chain_id
+        self.ws_url = ws_url
+        self.connected = False
+        self.head: Optional[int] = None
+
+    def __repr__(self):
+        return f"NewHeadsSubscription(chain_id={self.chain_id})"
+
+    async def listen(self, on_head: Callable[[int], None]) -> None:
+        """Calls `on_head` with each new block number until the socket drops."""
+        async with websockets.connect(
+            self.ws_url, ping_interval=defaults.WS_PING_INTERVAL
+        ) as ws:
+            request = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "eth_subscribe",
+                "params": ["newHeads"],
+            }
+            await ws.send(json.dumps(request))
+            response = json.loads(await ws.recv())
+            if "error" in response:
+                raise ConnectionError(f"eth_subscribe failed: {response['error']}")
+            subscription_id = response["result"]
+            LOGGER.info(f"Subscribed to new heads of chain #{self.chain_id}")
+
+            self.connected = True
+            try:
+                async for message in ws:
+                    params = json.loads(message).get("params") or {}
+                    if params.get("subscription") != subscription_id:
+                        continue
+                    self.head = int(params["result"]["number"], 16)
+                    on_head(self.head)
+            finally:
+                self.connected = False
+        raise ConnectionError("websocket closed")
@@ -0,0 +1,132 @@
+import asyncio
+import datetime
+from typing import Dict, Iterable, List, Optional
+
+from lru import LRU
+
+from pique.constants import defaults
+from pique.log import LOGGER
+from pique.providers import PooledHTTPProvider, ProviderRouter
+from pique.ratelimit import TokenBucket
+
+
+class ChainIdMismatch(ValueError):
+    pass
+
+
+class ProviderMetadata:
+    """
+    Caches static and slow-changing values read from a provider: the chain id,
+    resolved once at startup, and block timestamps, kept in an LRU cache and
+    fetched in JSON-RPC batches.
+    """
+
+    def __init__(
+        self,
+        w3,
+        rate_limiter: TokenBucket,
+        cache_size: int = defaults.BLOCK_TIMESTAMP_CACHE_SIZE,
+        batch_size: int = defaults.TIMESTAMP_BATCH_SIZE,
+    ):
+        self.w3 = w3
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+        self.chain_id: Optional[int] = None
+        self._timestamps = LRU(cache_size)
+
+    async def verify_chain_id(self, expected_chain_id: int) -> int:
+        if self.chain_id is not None:
+            return self.chain_id
+        await self.rate_limiter.acquire()
+        chain_id = await self.w3.eth.chain_id
+        # only a matching id is kept, so a mismatch fails every scan round
+        if chain_id != expected_chain_id:
+            raise ChainIdMismatch(
+                f"provider is on chain #{chain_id}, "
+                f"expected chain #{expected_chain_id}"
+            )
+        self.chain_id = chain_id
+        LOGGER.debug(f"Verified provider for chain #{self.chain_id}")
+        return self.chain_id
+
+    def _cache_timestamp(self, block_number: int, timestamp) -> datetime.datetime:
+        if isinstance(timestamp, str):
+            timestamp = int(timestamp, 16)
+        timestamp = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+        self._timestamps[block_number] = timestamp
+        return timestamp
+
+    def cache_log_timestamps(self, logs) -> None:
+        """Caches the block timestamps some providers include in raw logs."""
+        for log in logs:
+            timestamp = log.get("blockTimestamp")
+            if timestamp is not None:
+                self._cache_timestamp(log["blockNumber"], timestamp)
+
+    async def _fetch_block_timestamp(self, block_number: int) -> datetime.datetime:
+        await self.rate_limiter.acquire()
+        block = await self.w3.eth.get_block(block_number)
+        return self._cache_timestamp(block_number, block["timestamp"])
+
+    async def _fetch_block_timestamps(
+        self, block_numbers: List[int]
+    ) -> Dict[int, datetime.datetime]:
+        """
+        Fetches the timestamps of several blocks in one JSON-RPC batch, for a
+        single rate limit token. Blocks missing from the response are left out.
+        """
+        requests = [
+            {
+                "jsonrpc": "2.0",
+                "id": block_number,
+                "method": "eth_getBlockByNumber",
+                "params": [hex(block_number), False],
+            }
+            for block_number in block_numbers
+        ]
+        await self.rate_limiter.acquire()
+        try:
+            responses = await self.w3.provider.post(requests)
+        except Exception as e:
+            LOGGER.warning(f"Batched block timestamp request failed: {e}")
+            return {}
+        if not isinstance(responses, list):
+            # some nodes answer batches they do not support with a single error
+            return {}
+        timestamps = {}
+        for response in responses:
+            block = response.get("result") or {}
+            if response.get("id") in block_numbers and "timestamp" in block:
+                timestamps[response["id"]] = self._cache_timestamp(
+                    response["id"], block["timestamp"]
+                )
+        return timestamps
+
+    async def get_block_timestamps(
+        self, block_numbers: Iterable[int]
+    ) -> Dict[int, datetime.datetime]:
+        timestamps, missing = {}, []
+        for block_number in set(block_numbers):
+            timestamp = self._timestamps.get(block_number)
+            if timestamp is None:
+                missing.append(block_number)
+            else:
+                timestamps[block_number] = timestamp
+        if not missing:
+            return timestamps
+        if isinstance(self.w3.provider, (PooledHTTPProvider, ProviderRouter)):
+            chunks = [
+                missing[i : i + self.batch_size]
+                for i in range(0, len(missing), self.batch_size)
+            ]
+            for fetched in await asyncio.gather(
+                *(self._fetch_block_timestamps(chunk) for chunk in chunks)
+            ):
+                timestamps.update(fetched)
+            missing = [n for n in missing if n not in timestamps]
+        if missing:
+            fetched = await asyncio.gather(
+                *(self._fetch_block_timestamp(n) for n in missing)
+            )
+            timestamps.update(zip(missing, fetched))
+        return timestamps
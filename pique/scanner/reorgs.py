@@ -0,0 +1,61 @@
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from hexbytes import HexBytes
+
+from pique.scanner.events import Event
+
+
+class Retraction(NamedTuple):
+    """
+    Queued for a published event that a reorg orphaned and that rescanning
+    the canonical chain did not find again.
+    """
+
+    event: Event
+
+
+class BlockHashBuffer:
+    """
+    Ring buffer of recently scanned (block number, block hash) pairs and the
+    events published from each block, used to detect reorgs and to tell
+    which published events were orphaned by one.
+    """
+
+    def __init__(self, size: int):
+        self._blocks = deque(maxlen=size)
+        self._published: Dict[int, Dict[str, Event]] = {}
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def record(self, block_number: int, block_hash: HexBytes) -> None:
+        if self._blocks and self._blocks[-1][0] >= block_number:
+            return  # already recorded
+        if len(self._blocks) == self._blocks.maxlen:
+            evicted_block, _ = self._blocks[0]
+            self._published.pop(evicted_block, None)
+        self._blocks.append((block_number, HexBytes(block_hash)))
+
+    def record_events(self, events: List[Event]) -> None:
+        for event in events:
+            self.record(event.block_number, event.block_hash)
+            self._published.setdefault(event.block_number, {})[event.id] = event
+
+    def latest(self) -> Optional[Tuple[int, HexBytes]]:
+        return self._blocks[-1] if self._blocks else None
+
+    def oldest(self) -> Optional[Tuple[int, HexBytes]]:
+        return self._blocks[0] if self._blocks else None
+
+    def descending(self) -> Iterator[Tuple[int, HexBytes]]:
+        return reversed(list(self._blocks))
+
+    def rewind(self, fork_block: int) -> List[Event]:
+        """Drops every block after `fork_block`; returns their published events."""
+        orphaned = []
+        while self._blocks and self._blocks[-1][0] > fork_block:
+            block_number, _ = self._blocks.pop()
+            published = self._published.pop(block_number, {})
+            orphaned[:0] = published.values()  # oldest block first
+        return orphaned
@@ -1,33 +1,68 @@
 import asyncio
 from abc import ABC, abstractmethod
 from asyncio import Queue
-from typing import List
+from collections import deque
+from typing import Dict, List, Optional
 
-from pique.constants import _throttle
+from pique.constants import defaults
 from pique.log import LOGGER
-from pique.scanner.events import EventContainer, Event
+from pique.ratelimit import TokenBucket
+from pique.scanner.checkpoints import (
+    CheckpointStore,
+    MemoryCheckpointStore,
+    ScanProgress,
+)
+from pique.scanner.dedup import EventDeduplicator
+from pique.scanner.events import Event
+from pique.scanner.fetcher import (
+    ChainLogFetcher,
+    is_range_error,
+    make_chain_fetchers,
+)
+from pique.scanner.heads import NewHeadsSubscription
+from pique.scanner.reorgs import Retraction
 
 
 class AbstractEventScanner(ABC):
 
-    def __init__(self, queue: Queue):
+    def __init__(self, queue: Queue, deduplicator: Optional[EventDeduplicator] = None):
         self.queue = queue
+        if deduplicator is None:
+            deduplicator = EventDeduplicator()
+        self.deduplicator = deduplicator
 
     @abstractmethod
     async def start(self):
         """Start the EventScanner background tasks."""
         pass
 
-    async def handle_events(self, events: List[Event]) -> None:
+    async def handle_events(self, events: List[Event]) -> List[Event]:
         LOGGER.debug(f"Handling {len(events)} events")
+        events = self.deduplicator.filter(events)
         for event in events:
             await self.queue.put(event)
             LOGGER.debug(f"Added event #{event.id[:8]} to task queue (size: {self.queue.qsize()})")
+        return events
 
 
 class EventScanner(AbstractEventScanner):
     def __init__(
-        self, events, providers, batch_size, start_block, loop_interval, *args, **kwargs
+        self,
+        events,
+        providers,
+        batch_size,
+        start_block,
+        loop_interval,
+        min_batch_size=defaults.MIN_BATCH_SIZE,
+        max_batch_size=defaults.MAX_BATCH_SIZE,
+        confirmations: Optional[Dict[int, int]] = None,
+        concurrency=defaults.CONCURRENCY,
+        rate_limit=defaults.RATE_LIMIT,
+        max_backfill=defaults.MAX_BACKFILL,
+        checkpoints: Optional[CheckpointStore] = None,
+        ws_urls: Optional[Dict[int, str]] = None,
+        *args,
+        **kwargs,
     ):
         super().__init__(*args, **kwargs)
         self.events = events
@@ -35,11 +70,32 @@ class EventScanner(AbstractEventScanner):
         self.batch_size = batch_size
         self.start_block = start_block
         self.loop_interval = loop_interval
+        self.concurrency = concurrency
+        self.max_backfill = max_backfill
+        self.checkpoints = checkpoints or MemoryCheckpointStore()
         self.events_processed = 0
 
+        # one token bucket per chain, shared by every request made on it; a
+        # router of rate-limited endpoints allows their combined rate
+        self.rate_limiters = {}
+        for chain_id, provider in providers.items():
+            chain_rate_limit = getattr(provider, "rate_limit", None) or rate_limit
+            self.rate_limiters[chain_id] = TokenBucket(rate=chain_rate_limit)
+        self.fetchers = make_chain_fetchers(
+            events,
+            rate_limiters=self.rate_limiters,
+            confirmations=confirmations or {},
+            batch_size=batch_size,
+            min_batch_size=min_batch_size,
+            max_batch_size=max_batch_size,
+        )
+        # chains with a websocket endpoint are scanned on each new head
+        self.head_subscriptions = {
+            chain_id: NewHeadsSubscription(chain_id=chain_id, ws_url=ws_url)
+            for chain_id, ws_url in (ws_urls or {}).items()
+            if ws_url
+        }
         self._subscribers = set()
-        # Initialize the loop for web3 event checking
-        asyncio.create_task(self.initialize_check_web3_events())
 
     async def initialize_check_web3_events(self):
         while True:
@@ -47,67 +103,220 @@ class EventScanner(AbstractEventScanner):
             await asyncio.sleep(self.loop_interval)  # Delay for loop_interval seconds
 
     async def fetch_events(
-        self, event_container: EventContainer, start_block: int, batch_size: int
-    ) -> None:
-        LOGGER.info(
-            f"Fetching events for {event_container.name}|{event_container.address[:8]}"
+        self, fetcher: ChainLogFetcher, start_block: int, end_block: int
+    ) -> List[Event]:
+        LOGGER.debug(
+            f"Fetching from block {start_block} to {end_block} "
+            f"for {len(fetcher.containers)} events on chain #{fetcher.chain_id}"
         )
-        async with event_container.lock:
-            try:
-                latest_block = event_container.w3.eth.block_number
-                end_block = min(start_block + batch_size, latest_block)
-                if end_block <= start_block:
-                    return
+        try:
+            events = await fetcher.get_logs(from_block=start_block, to_block=end_block)
+        except Exception as e:
+            if start_block == end_block or not is_range_error(e):
+                raise
+            # split the rejected range and use smaller ranges from now on
+            LOGGER.warning(
+                f"Range {start_block}-{end_block} rejected "
+                f"on chain #{fetcher.chain_id}: {e}"
+            )
+            fetcher.shrink_batch_size(rejected_size=end_block - start_block + 1)
+            middle_block = (start_block + end_block) // 2
+            events = await self.fetch_events(fetcher, start_block, middle_block)
+            events += await self.fetch_events(fetcher, middle_block + 1, end_block)
+            return events
 
-                LOGGER.debug(
-                    f"Fetching from block {start_block} to {end_block} for event: {event_container.name}"
-                )
-                events = event_container.get_logs(
-                    fromBlock=start_block, toBlock=end_block
+        fetcher.grow_batch_size(num_results=len(events))
+        return events
+
+    async def check_reorg(self, fetcher: ChainLogFetcher) -> None:
+        """
+        Compares the most recently scanned block hash with the canonical chain
+        and, on mismatch, rewinds the chain to the last common block so the
+        affected range is scanned again.
+        """
+        recent_blocks = fetcher.recent_blocks
+        latest = recent_blocks.latest()
+        if latest is None:
+            return
+        block_number, block_hash = latest
+        if await fetcher.get_block_hash(block_number) == block_hash:
+            return
+
+        fork_block = recent_blocks.oldest()[0] - 1
+        for number, recorded_hash in recent_blocks.descending():
+            if await fetcher.get_block_hash(number) == recorded_hash:
+                fork_block = number
+                break
+        else:
+            LOGGER.warning(
+                f"Reorg on chain #{fetcher.chain_id} is deeper than "
+                f"{len(recent_blocks)} recorded blocks"
+            )
+
+        LOGGER.warning(
+            f"Reorg detected on chain #{fetcher.chain_id}; "
+            f"rescanning from block {fork_block + 1}"
+        )
+        rescan_until = fetcher.latest_scanned_block
+        for event in recent_blocks.rewind(fork_block):
+            fetcher.orphaned_events[event.id] = (rescan_until, event)
+        fetcher.rewind(fork_block)
+        await self.queue.put(ScanProgress(fetcher.checkpoints(), []))
+
+    @staticmethod
+    def _dedupe_orphaned(fetcher: ChainLogFetcher, events: List[Event]) -> List[Event]:
+        """Drops rescanned events that were already published before a reorg."""
+        if not fetcher.orphaned_events:
+            return events
+        return [e for e in events if fetcher.orphaned_events.pop(e.id, None) is None]
+
+    async def _retract_orphaned(self, fetcher: ChainLogFetcher) -> None:
+        """Retracts published events that did not reappear after a rescan."""
+        for event_id, (rescan_until, event) in list(fetcher.orphaned_events.items()):
+            if fetcher.latest_scanned_block >= rescan_until:
+                LOGGER.warning(
+                    f"Event #{event_id[:8]} on chain #{fetcher.chain_id} "
+                    f"was orphaned by a reorg; retracting it"
                 )
+                del fetcher.orphaned_events[event_id]
+                await self.queue.put(Retraction(event))
+
+    async def scan_range(
+        self, fetcher: ChainLogFetcher, start_block: int, latest_block: int
+    ) -> None:
+        """
+        Scans a block range keeping up to `concurrency` sub-ranges in flight
+        while delivering events in block/log order.
+        """
+        in_flight = deque()
+        try:
+            while start_block <= latest_block or in_flight:
+                while start_block <= latest_block and len(in_flight) < self.concurrency:
+                    end_block = min(start_block + fetcher.batch_size - 1, latest_block)
+                    task = asyncio.create_task(
+                        self.fetch_events(fetcher, start_block, end_block)
+                    )
+                    in_flight.append((start_block, end_block, task))
+                    start_block = end_block + 1
+
+                window_start, window_end, task = in_flight.popleft()
+                found = await task
+                # rescanned events stay published, so a later reorg retracts them
+                fetcher.recent_blocks.record_events(found)
+                events = self._dedupe_orphaned(fetcher, found)
                 num_new_events = len(events)
+                queued = []
                 if num_new_events > 0:
                     LOGGER.info(f"Found {num_new_events} new events")
-                    await self.handle_events(events=events)
+                    queued = await self.handle_events(events=events)
 
-                event_container.latest_scanned_block = end_block
+                fetcher.mark_scanned(window_end)
+                fetcher.record_progress(latest_block)
+                # committed by the subscription manager after the events are stored
+                progress = ScanProgress(fetcher.checkpoints(), [e.id for e in queued])
+                await self.queue.put(progress)
                 self.events_processed += num_new_events
-            except Exception as e:
-                LOGGER.error(f"Error in check_web3_events: {e}")
-
-    async def check_web3_events(self):
-        LOGGER.debug("Next round of web3 event checking.")
-        try:
-            for event_container in self.events:
                 LOGGER.debug(
-                    f"Scanning {event_container.name}|{event_container.address[:8]}"
+                    f"Finished fetching events from {window_start} to {window_end}"
                 )
-                start_block = event_container.latest_scanned_block + 1
-                latest_block = event_container.w3.eth.block_number
+        finally:
+            for _, _, task in in_flight:
+                task.cancel()
+
+    async def scan_chain(self, fetcher: ChainLogFetcher) -> None:
+        """Scans a chain up to its latest confirmed block."""
+        async with fetcher.lock:
+            LOGGER.debug(f"Scanning {fetcher}")
+            try:
+                if fetcher.metadata.chain_id is None:
+                    await fetcher.verify()
+                latest_block = await fetcher.get_safe_block_number()
                 LOGGER.debug(f"Latest block: {latest_block}")
+                fetcher.initialize(
+                    latest_block,
+                    start_block=self.start_block,
+                    checkpoints=self.checkpoints,
+                    max_backfill=self.max_backfill,
+                )
+                await self.check_reorg(fetcher)
+                fetcher.record_progress(latest_block)
 
-                while start_block <= latest_block:
-                    LOGGER.debug(
-                        f"Fetching events from {start_block} to {start_block + self.batch_size}"
-                    )
-                    await self.fetch_events(
-                        event_container, start_block, self.batch_size
-                    )
-                    LOGGER.debug(
-                        f"Finished fetching events from {start_block} to {start_block + self.batch_size}"
-                    )
-                    start_block += self.batch_size
-                    await asyncio.sleep(_throttle.BATCH)
+                start_block = fetcher.latest_scanned_block + 1
+                await self.scan_range(fetcher, start_block, latest_block)
 
-                LOGGER.debug(
-                    f"Finished scanning {event_container.name}|{event_container.address[:8]}"
-                )
+                # anchor the scanned head so the next round can detect a reorg
+                scanned_block = fetcher.latest_scanned_block
+                recorded = fetcher.recent_blocks.latest()
+                if recorded is None or recorded[0] < scanned_block:
+                    scanned_hash = await fetcher.get_block_hash(scanned_block)
+                    if scanned_hash is not None:
+                        fetcher.recent_blocks.record(scanned_block, scanned_hash)
+                await self._retract_orphaned(fetcher)
+            except Exception as e:
+                # the next round resumes from the last delivered block range
+                LOGGER.error(f"Error scanning chain #{fetcher.chain_id}: {e}")
+
+            LOGGER.debug(f"Finished scanning {fetcher}")
 
-                await asyncio.sleep(_throttle.SCANNER)
+    def commit_progress(self, progress: ScanProgress) -> None:
+        """Persists a scanned range once its events are in the outbox."""
+        self.checkpoints.put(progress.checkpoints)
+        self.deduplicator.persist(progress.event_ids)
+
+    async def check_web3_events(self):
+        LOGGER.debug("Next round of web3 event checking.")
+        # chains with a live head subscription are scanned as blocks arrive
+        fetchers = [
+            fetcher
+            for fetcher in self.fetchers
+            if not self._is_subscribed(fetcher.chain_id)
+        ]
+        try:
+            await asyncio.gather(*(self.scan_chain(f) for f in fetchers))
         except Exception as e:
             LOGGER.error(f"Error in check_web3_events: {e}")
 
+    def _is_subscribed(self, chain_id: int) -> bool:
+        subscription = self.head_subscriptions.get(chain_id)
+        return subscription is not None and subscription.connected
+
+    async def watch_heads(self, fetcher: ChainLogFetcher) -> None:
+        """
+        Scans a chain as soon as its websocket reports a new head. Heads that
+        arrive during a scan are coalesced into one follow-up scan. While the
+        socket is down the chain is picked up by the polling loop again.
+        """
+        subscription = self.head_subscriptions[fetcher.chain_id]
+        while True:
+            new_head = asyncio.Event()
+            listener = asyncio.create_task(
+                subscription.listen(on_head=lambda _: new_head.set())
+            )
+            try:
+                while not listener.done():
+                    waiter = asyncio.create_task(new_head.wait())
+                    await asyncio.wait(
+                        {waiter, listener}, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    waiter.cancel()
+                    if new_head.is_set():
+                        new_head.clear()
+                        await self.scan_chain(fetcher)
+                listener.result()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER.warning(
+                    f"Head subscription of chain #{fetcher.chain_id} failed: {e}; "
+                    f"polling every {self.loop_interval}s until it reconnects"
+                )
+            finally:
+                listener.cancel()
+            await asyncio.sleep(defaults.WS_RECONNECT_DELAY)
+
     def start(self):
         """Start the EventScanner background tasks."""
-        # asyncio.create_task(self.process_queue())
         asyncio.create_task(self.initialize_check_web3_events())
+        for fetcher in self.fetchers:
+            if fetcher.chain_id in self.head_subscriptions:
+                asyncio.create_task(self.watch_heads(fetcher))
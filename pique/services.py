@@ -1,13 +1,28 @@
 from asyncio import Queue
 
 from pique.config import PiqueConfig
+from pique import metrics
 from pique.discord.bot import PiqueCog
+from pique.outbox import load_outbox
+from pique.providers import close_providers
+from pique.queues import make_event_queue
+from pique.scanner.checkpoints import load_checkpoint_store
+from pique.scanner.dedup import load_deduplicator
 from pique.scanner.scanner import EventScanner
+from pique.sinks import load_sinks
 from pique.subscriptions import SubscriptionManager
 
 
 async def _run_internal_services(config: PiqueConfig):
-    event_queue = Queue()
+    event_queue = make_event_queue(
+        max_size=config.queue_size, overflow=config.queue_overflow
+    )
+    metrics.QUEUE_DEPTH.track(event_queue.qsize, queue="events")
+    if config.metrics_port is not None:
+        server = metrics.MetricsServer(
+            host=config.metrics_host, port=config.metrics_port
+        )
+        await server.start()
     services = load_internal_services(config=config, event_queue=event_queue)
     for service in services:
         service.start()
@@ -23,7 +38,11 @@ async def run_discord_bot(config):
         event_scanner=scanner,
         subscription_manager=manager,
     )
-    await bot.start()
+    try:
+        await bot.start()
+    finally:
+        await manager.close()
+        await close_providers(config.providers)
 
 
 def load_internal_services(config: PiqueConfig, event_queue: Queue) -> tuple:
@@ -31,14 +50,27 @@ def load_internal_services(config: PiqueConfig, event_queue: Queue) -> tuple:
         events=config.events,
         providers=config.providers,
         batch_size=config.batch_size,
+        min_batch_size=config.min_batch_size,
+        max_batch_size=config.max_batch_size,
+        confirmations={cid: c.confirmations for cid, c in config.chains.items()},
         start_block=config.start_block,
         loop_interval=config.loop_interval,
+        concurrency=config.concurrency,
+        rate_limit=config.rate_limit,
+        max_backfill=config.max_backfill,
+        ws_urls={cid: c.ws_url for cid, c in config.chains.items()},
+        checkpoints=load_checkpoint_store(config.checkpoints),
+        deduplicator=load_deduplicator(config.dedup_size, filepath=config.checkpoints),
         queue=event_queue,
     )
 
     subscription_manager = SubscriptionManager.from_config(
         config=config,
         event_queue=event_queue,
+        sinks=load_sinks(config.subscribers),
+        outbox=load_outbox(config.checkpoints),
+        on_progress=scanner.commit_progress,
     )
+    metrics.QUEUE_DEPTH.track(subscription_manager.outbox.count, queue="outbox")
 
     return scanner, subscription_manager
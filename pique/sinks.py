@@ -0,0 +1,390 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from pique.constants import defaults
+from pique.digest import Digester, EventDigest
+from pique.log import LOGGER
+from pique.subscriptions import (
+    DeliveryError,
+    PermanentDeliveryError,
+    Subscriber,
+    SubscriptionRoute,
+)
+
+EVENT_RECORD = "event"
+DIGEST_RECORD = "digest"
+RETRACTION_RECORD = "retraction"
+
+
+def _dumps(record: Dict) -> str:
+    return json.dumps(record, separators=(",", ":"))
+
+
+class _Sink(Subscriber):
+    """
+    Common handling of the non-Discord subscribers, which write events,
+    digests and retractions alike as JSON records.
+    """
+
+    _NAME = ""
+
+    async def _publish(self, records: List[Dict], kind: str) -> None:
+        raise NotImplementedError
+
+    async def notify(self, event):
+        await self.notify_batch([event])
+
+    async def notify_batch(self, events):
+        await self._publish([event.to_dict() for event in events], EVENT_RECORD)
+        self.metrics.delivered += len(events)
+
+    async def notify_digests(self, digests: List[EventDigest]):
+        records = [digest.to_dict() for digest in digests]
+        await self._publish(records, DIGEST_RECORD)
+        self.metrics.delivered += sum(digest.count for digest in digests)
+
+    async def notify_retractions(self, events):
+        records = [{"type": RETRACTION_RECORD, **event.to_dict()} for event in events]
+        await self._publish(records, RETRACTION_RECORD)
+
+    @classmethod
+    def _subscriber_kwargs(cls, config: Dict) -> Dict:
+        digest = config.get("digest")
+        return dict(
+            name=config.get("name", cls._NAME),
+            description=config.get("description", ""),
+            max_queue_size=config.get("max_queue_size", defaults.SUBSCRIBER_QUEUE_SIZE),
+            digest=Digester.from_config(digest) if digest else None,
+            route=SubscriptionRoute.from_config(config),
+            batch_size=config.get("batch_size"),
+            batch_wait=config.get("batch_wait"),
+            max_delivery_retries=config.get(
+                "max_delivery_retries", defaults.DELIVERY_MAX_RETRIES
+            ),
+            key=config.get("key"),
+        )
+
+
+class WebhookSubscriber(_Sink):
+    """POSTs batches of events as a JSON array to an HTTP endpoint."""
+
+    _NAME = "webhook"
+    _RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = defaults.REQUEST_TIMEOUT,
+        pool_size: int = defaults.POOL_SIZE,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.url = url
+        self.headers = headers or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _default_key(self) -> str:
+        return f"{self._NAME}:{self.url}"
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                headers={"Content-Type": "application/json", **self.headers},
+                timeout=self.timeout,
+            )
+        return self._session
+
+    async def _post(self, body: str) -> None:
+        """Makes one delivery attempt; the outbox schedules any retries."""
+        try:
+            async with self.session.post(self.url, data=body) as response:
+                if response.status < 300:
+                    return
+                error = f"webhook {self.url} failed: HTTP {response.status}"
+                if response.status not in self._RETRY_STATUSES:
+                    raise PermanentDeliveryError(error)
+                retry_after = response.headers.get("Retry-After")
+                if retry_after is not None and retry_after.isdigit():
+                    raise DeliveryError(error, retry_after=int(retry_after))
+                raise DeliveryError(error)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise DeliveryError(f"webhook {self.url} failed: {e!r}") from e
+
+    async def _publish(self, records: List[Dict], kind: str) -> None:
+        await self._post(_dumps(records))
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    @classmethod
+    def from_config(cls, config: Dict):
+        return cls(
+            url=config["url"],
+            headers=config.get("headers"),
+            timeout=config.get("timeout", defaults.REQUEST_TIMEOUT),
+            pool_size=config.get("pool_size", defaults.POOL_SIZE),
+            **cls._subscriber_kwargs(config),
+        )
+
+
+class FileSubscriber(_Sink):
+    """
+    Appends events to a JSON lines file, or writes them to Parquet files when
+    `format` is "parquet" (requires pyarrow): `path` for the first row group,
+    then `<stem>-1.parquet`, `<stem>-2.parquet`, ... Writes run off the event
+    loop. Digests and retractions are written as JSON lines only.
+    """
+
+    _NAME = "file"
+    _PARQUET_COLUMNS = (
+        "id",
+        "chain_id",
+        "contract_address",
+        "event",
+        "block_number",
+        "tx_hash",
+        "log_index",
+        "timestamp",
+        "args",
+    )
+
+    def __init__(
+        self,
+        path: str,
+        format: str = "jsonl",
+        row_group_size: int = defaults.PARQUET_ROW_GROUP_SIZE,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        if format not in ("jsonl", "parquet"):
+            raise ValueError(f"unsupported file format {format}")
+        if format == "parquet":
+            if self.digest is not None:
+                raise ValueError("digests cannot be written in the parquet format")
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                raise ValueError("the parquet format requires pyarrow")
+        self.path = Path(path)
+        self.format = format
+        self.row_group_size = row_group_size
+        self._file = None
+        self._rows: List[Dict] = []
+
+    def _default_key(self) -> str:
+        return f"{self._NAME}:{self.path.resolve()}"
+
+    @property
+    def buffered(self) -> int:
+        return len(self._rows)
+
+    def _parquet_path(self) -> Path:
+        # a Parquet file is only readable once closed, so each row group is
+        # written as a complete file of its own
+        path, part = self.path, 0
+        while path.exists():
+            part += 1
+            path = self.path.with_name(f"{self.path.stem}-{part}{self.path.suffix}")
+        return path
+
+    def _write_lines(self, text: str) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(
+                self.path, "a", encoding="utf-8", buffering=defaults.FILE_BUFFER_SIZE
+            )
+        self._file.write(text)
+        self._file.flush()
+
+    def _write_row_group(self) -> None:
+        import pyarrow
+        import pyarrow.parquet
+
+        columns = {c: [row[c] for row in self._rows] for c in self._PARQUET_COLUMNS}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pyarrow.parquet.write_table(pyarrow.table(columns), self._parquet_path())
+        self._rows = []
+
+    async def notify_retractions(self, events):
+        if self.format == "jsonl":
+            await super().notify_retractions(events)
+            return
+        # parquet files are written once, so retracted rows stay in them
+        for event in events:
+            LOGGER.warning(
+                f"Event #{event.id[:8]} in {self.path} was orphaned by a reorg"
+            )
+
+    async def _publish(self, records: List[Dict], kind: str) -> None:
+        loop = asyncio.get_running_loop()
+        if self.format == "jsonl":
+            text = "".join(_dumps(record) + "\n" for record in records)
+            await loop.run_in_executor(None, self._write_lines, text)
+            return
+        for record in records:
+            record["args"] = _dumps(record["args"])
+            self._rows.append(record)
+        # row groups are only worth writing once they hold enough rows
+        if len(self._rows) >= self.row_group_size:
+            await loop.run_in_executor(None, self._write_row_group)
+
+    async def close(self) -> None:
+        if self._rows:
+            self._write_row_group()
+        if self._file is not None:
+            self._file.close()
+
+    @classmethod
+    def from_config(cls, config: Dict):
+        return cls(
+            path=config["path"],
+            format=config.get("format", "jsonl"),
+            row_group_size=config.get(
+                "row_group_size", defaults.PARQUET_ROW_GROUP_SIZE
+            ),
+            **cls._subscriber_kwargs(config),
+        )
+
+
+def _encode_command(*parts) -> bytes:
+    encoded = [p if isinstance(p, bytes) else str(p).encode() for p in parts]
+    chunks = [b"*%d\r\n" % len(encoded)]
+    for part in encoded:
+        chunks.append(b"$%d\r\n%s\r\n" % (len(part), part))
+    return b"".join(chunks)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = (await reader.readline()).rstrip(b"\r\n")
+    if not line:
+        raise ConnectionError("stream connection closed")
+    kind, payload = line[:1], line[1:]
+    if kind == b"-":
+        raise ConnectionError(payload.decode())
+    if kind in (b"+", b":"):
+        return payload
+    if kind == b"$":
+        size = int(payload)
+        if size < 0:
+            return None
+        return (await reader.readexactly(size + 2))[:-2]
+    if kind == b"*":
+        return [await _read_reply(reader) for _ in range(max(0, int(payload)))]
+    raise ConnectionError(f"unexpected reply {line!r}")
+
+
+class StreamSubscriber(_Sink):
+    """
+    Publishes events to a Redis-compatible stream with pipelined XADD commands
+    over TCP (redis://host:port) or a Unix socket (unix:///path). The entry's
+    field is "event", "digest" or "retraction". With the "jsonl" protocol,
+    records are written to the socket as JSON lines instead.
+    """
+
+    _NAME = "stream"
+
+    def __init__(
+        self,
+        url: str,
+        stream: str = defaults.STREAM_NAME,
+        maxlen: Optional[int] = None,
+        protocol: str = "redis",
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        if protocol not in ("redis", "jsonl"):
+            raise ValueError(f"unsupported stream protocol {protocol}")
+        self.url = urlparse(url)
+        self.stream = stream
+        self.maxlen = maxlen
+        self.protocol = protocol
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    def _default_key(self) -> str:
+        return f"{self._NAME}:{self.url.geturl()}#{self.stream}"
+
+    async def _connect(self) -> None:
+        if self.url.scheme == "unix":
+            reader, writer = await asyncio.open_unix_connection(self.url.path)
+        else:
+            reader, writer = await asyncio.open_connection(
+                self.url.hostname, self.url.port or 6379
+            )
+        self._reader, self._writer = reader, writer
+        LOGGER.info(f"Connected stream subscriber {self.name} to {self.url.geturl()}")
+
+    def _encode(self, records: List[Dict], kind: str) -> bytes:
+        if self.protocol == "jsonl":
+            return "".join(_dumps(record) + "\n" for record in records).encode()
+        trim = ("MAXLEN", "~", self.maxlen) if self.maxlen else ()
+        return b"".join(
+            _encode_command("XADD", self.stream, *trim, "*", kind, _dumps(record))
+            for record in records
+        )
+
+    async def _send(self, payload: bytes, replies: int) -> None:
+        if self._writer is None:
+            await self._connect()
+        self._writer.write(payload)
+        await self._writer.drain()
+        for _ in range(replies):
+            await _read_reply(self._reader)
+
+    async def _publish(self, records: List[Dict], kind: str) -> None:
+        payload = self._encode(records, kind)
+        replies = len(records) if self.protocol == "redis" else 0
+        try:
+            await self._send(payload, replies)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            # reconnect on the outbox's next attempt
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    @classmethod
+    def from_config(cls, config: Dict):
+        return cls(
+            url=config["url"],
+            stream=config.get("stream", defaults.STREAM_NAME),
+            maxlen=config.get("maxlen"),
+            protocol=config.get("protocol", "redis"),
+            **cls._subscriber_kwargs(config),
+        )
+
+
+SINK_TYPES = {
+    WebhookSubscriber._NAME: WebhookSubscriber,
+    FileSubscriber._NAME: FileSubscriber,
+    StreamSubscriber._NAME: StreamSubscriber,
+}
+
+
+def load_sinks(configs: List[Dict]) -> List[Subscriber]:
+    sinks = []
+    for config in configs:
+        sink_type = config.get("type")
+        if sink_type not in SINK_TYPES:
+            message = f"unknown subscriber type {sink_type}"
+            LOGGER.error(message)
+            raise ValueError(message)
+        sinks.append(SINK_TYPES[sink_type].from_config(config))
+    return sinks
@@ -1,26 +1,419 @@
 import asyncio
+import time
 from abc import ABC, abstractmethod
 from asyncio import Queue
-from typing import List
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
 from typing import Optional
 
-from discord import TextChannel
+from discord import TextChannel, RateLimited
 
+from pique import metrics
 from pique.config import PiqueConfig
-from pique.constants import _throttle
-from pique.discord.embeds import create_event_embed
+from pique.constants import defaults
+from pique.digest import Digester, EventDigest
+from pique.discord.embeds import (
+    create_digest_embed,
+    create_event_embed,
+    create_retraction_embed,
+    pack_embeds,
+)
 from pique.log import LOGGER
+from pique.outbox import MemoryOutbox, Outbox, backoff_delay
+from pique.scanner.checkpoints import ScanProgress
+from pique.scanner.decoding import compile_predicate
+from pique.scanner.reorgs import Retraction
+
+DispatchKey = Tuple[int, str, str]
+
+
+class DeliveryError(ConnectionError):
+    """A failed delivery, retried no sooner than `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PermanentDeliveryError(Exception):
+    """A delivery the receiver rejected, which retrying cannot fix."""
+
+
+def dispatch_key(chain_id: int, address: str, event_name: str) -> DispatchKey:
+    return int(chain_id), address.lower(), event_name
+
+
+async def next_batch(queue: Queue, batch_size: int, batch_wait: float) -> list:
+    """
+    Waits for the next queue item, then collects more until `batch_size`
+    items are gathered or `batch_wait` seconds have passed.
+    """
+    items = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + batch_wait
+    while len(items) < batch_size:
+        if not queue.empty():
+            items.append(queue.get_nowait())
+            continue
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout)
+        except asyncio.TimeoutError:
+            break
+        items.append(item)
+    return items
+
+
+class SubscriberMetrics:
+    def __init__(self):
+        self.received = 0
+        self.delivered = 0
+        self.failed = 0
+        self.parked = 0  # events left in the outbox while the queue was full
+        self.queue_high_water = 0
+        self.last_latency = 0.0  # seconds from fan-out to delivery
+        self.max_latency = 0.0
+
+    def record_latency(self, latency: float) -> None:
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+
+
+class SubscriptionRoute:
+    """
+    The tracked events a subscriber receives: contracts (addresses or names),
+    event names and argument filters. Unset criteria match everything, empty
+    ones match nothing.
+    """
+
+    def __init__(
+        self,
+        contracts: Optional[List[str]] = None,
+        events: Optional[List[str]] = None,
+        filters: Optional[Dict] = None,
+    ):
+        self.contracts = (
+            {c.lower() for c in contracts} if contracts is not None else None
+        )
+        self.events = set(events) if events is not None else None
+        self.filters = filters or {}
+
+    def matches(self, container) -> bool:
+        if self.events is not None and container.name not in self.events:
+            return False
+        if self.contracts is None:
+            return True
+        return (
+            container.address.lower() in self.contracts
+            or container.contract_name.lower() in self.contracts
+        )
+
+    def check_filters(self, containers) -> None:
+        """Rejects filters on arguments that none of the routed events have."""
+        arg_names = {i["name"] for c in containers for i in c.abi["inputs"]}
+        unknown = sorted(set(self.filters) - arg_names)
+        if unknown:
+            raise ValueError(
+                f"no routed event has the filtered arguments {', '.join(unknown)}"
+            )
+
+    def predicate(self, container) -> Optional[Callable[[Dict], bool]]:
+        """Filters on the arguments this container's event actually has."""
+        arg_names = {i["name"] for i in container.abi["inputs"]}
+        filters = {k: v for k, v in self.filters.items() if k in arg_names}
+        return compile_predicate(container.abi, filters)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SubscriptionRoute":
+        return cls(
+            contracts=config.get("contracts"),
+            events=config.get("events"),
+            filters=config.get("filters"),
+        )
 
 
 class Subscriber(ABC):
-    def __init__(self, name: str, description: str):
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        max_queue_size: int = defaults.SUBSCRIBER_QUEUE_SIZE,
+        digest: Optional[Digester] = None,
+        route: Optional[SubscriptionRoute] = None,
+        batch_size: Optional[int] = None,
+        batch_wait: Optional[float] = None,
+        max_delivery_retries: int = defaults.DELIVERY_MAX_RETRIES,
+        key: Optional[str] = None,
+    ):
         self.name = name
+        self._key = key
         self.description = description
+        self.route = route or SubscriptionRoute()
+        # per-subscriber batching, else the manager's
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_delivery_retries = max_delivery_retries
+        # summarizes (some) events per window instead of relaying each one
+        self.digest = digest
+        # (fan-out time, outbox seq, failed attempts, event) waiting for the worker
+        self.queue = Queue(maxsize=max_queue_size)
+        self.outbox: Outbox = MemoryOutbox()
+        self.metrics = SubscriberMetrics()
+        metrics.QUEUE_DEPTH.track(self.queue.qsize, queue=name)
+        # a parked subscriber takes no fanned-out events; its worker re-reads
+        # them from the outbox, after the last seq it queued
+        self._parked = False
+        self._last_seq = 0
+        self._worker = None
+        self._digest_worker = None
+        # delivered seqs the subscriber may still hold in a write buffer
+        self._unflushed: List[int] = []
+
+    @property
+    def key(self) -> str:
+        """Identifies the subscriber's deliveries in the outbox across restarts."""
+        return self._key or self._default_key()
+
+    def _default_key(self) -> str:
+        return self.name
 
     @abstractmethod
     def notify(self, event):
         raise NotImplementedError
 
+    @abstractmethod
+    async def notify_digests(self, digests: List[EventDigest]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def notify_retractions(self, events):
+        """Withdraws delivered events that a reorg orphaned."""
+        raise NotImplementedError
+
+    def _fold(self, items) -> Tuple[list, list, List[EventDigest]]:
+        """
+        Splits the queued items in one pass into events to relay and
+        retractions, folding the events the digest accepts into it, once each.
+        Returns them with the digests whose count window closed. Folded events
+        are acked at once, so the outbox never holds more than a batch of them;
+        a crash loses the open windows' partial aggregates.
+        """
+        relayed, retracted, closed, folded = [], [], [], []
+        for item in items:
+            _, seq, _, event = item
+            if isinstance(event, Retraction):
+                retracted.append(item)
+            elif self.digest is None or not self.digest.accepts(event):
+                relayed.append(item)
+            else:
+                folded.append(seq)
+                digest = self.digest.add(event)
+                if digest is not None:
+                    closed.append(digest)
+        if folded:
+            self.outbox.ack(self.key, folded)
+        return relayed, retracted, closed
+
+    async def process_digests(self):
+        """Publishes digests as their time windows close."""
+        while True:
+            await asyncio.sleep(self.digest.next_due())
+            digests = self.digest.due()
+            if digests:
+                await self._deliver_digests(digests, attempts=0)
+
+    async def _deliver_digests(self, digests: List[EventDigest], attempts: int):
+        count = sum(digest.count for digest in digests)
+        # the folded events were acked already, so digests have no outbox rows
+        await self._deliver_with_retry(
+            self.notify_digests, digests, [], attempts, count, held=False
+        )
+
+    async def notify_batch(self, events):
+        """Delivers events, raising if any could not be delivered."""
+        for event in events:
+            await self.notify(event)
+            self.metrics.delivered += 1
+
+    def offer(self, event, seq: int) -> bool:
+        """
+        Queues a fanned-out event without waiting. A full queue parks the
+        subscriber instead, leaving its events in the outbox until the worker
+        has room to read them back.
+        """
+        if not self._parked and self.queue.full():
+            self._parked = True
+            LOGGER.warning(
+                f"Subscriber {self.name} queue is full, reading from the outbox"
+            )
+        if self._parked:
+            self.metrics.parked += 1
+            return False
+        self._put(event, seq=seq, attempts=0)
+        return True
+
+    def _put(self, event, seq: int, attempts: int) -> None:
+        self.queue.put_nowait((time.monotonic(), seq, attempts, event))
+        self._last_seq = seq
+        self.metrics.received += 1
+        self.metrics.queue_high_water = max(
+            self.metrics.queue_high_water, self.queue.qsize()
+        )
+
+    def _refill(self) -> int:
+        """Queues a parked subscriber's outbox events, unparking once caught up."""
+        limit = None
+        if self.queue.maxsize > 0:
+            limit = self.queue.maxsize - self.queue.qsize()
+            if limit <= 0:
+                return 0
+        pending = self.outbox.pending(self.key, after_seq=self._last_seq, limit=limit)
+        for seq, attempts, event in pending:
+            self._put(event, seq=seq, attempts=attempts)
+        if limit is None or len(pending) < limit:
+            self._parked = False
+        if pending:
+            LOGGER.debug(f"Read {len(pending)} events for {self.name} from the outbox")
+        return len(pending)
+
+    async def _deliver_with_retry(
+        self,
+        deliver,
+        payload,
+        seqs: List[int],
+        attempts: int,
+        count: int,
+        held: bool = True,
+    ):
+        """
+        Delivers a batch, retrying failures with jittered exponential backoff
+        and recording every outcome in the outbox. Delivery is at least once:
+        a batch that failed partway is retried in full. A batch the receiver
+        rejected with a PermanentDeliveryError is marked failed at once.
+        Only `held` batches of events wait for the subscriber's write buffer
+        before they are acked.
+        """
+        while True:
+            try:
+                await deliver(payload)
+                if held:
+                    self._ack(seqs)
+                else:
+                    self.outbox.ack(self.key, seqs)
+                return
+            except Exception as e:
+                attempts += 1
+                permanent = isinstance(e, PermanentDeliveryError)
+                if permanent or attempts > self.max_delivery_retries:
+                    self.outbox.fail(self.key, seqs)
+                    self.metrics.failed += count
+                    LOGGER.error(
+                        f"Giving up on {count} events for subscriber "
+                        f"{self.name} after {attempts} attempts: {e}"
+                    )
+                    return
+                self.outbox.retry(self.key, seqs, attempts)
+                delay = backoff_delay(attempts - 1)
+                if isinstance(e, DeliveryError) and e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                LOGGER.warning(
+                    f"Delivery to subscriber {self.name} failed ({e}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    @property
+    def buffered(self) -> int:
+        """The most recently delivered events not yet durably written."""
+        return 0
+
+    def _ack(self, seqs: List[int]) -> None:
+        """Acks delivered events, except those the subscriber still buffers."""
+        self._unflushed.extend(seqs)
+        flushed = len(self._unflushed) - self.buffered
+        if flushed > 0:
+            self.outbox.ack(self.key, self._unflushed[:flushed])
+            del self._unflushed[:flushed]
+
+    def ack_flushed(self) -> None:
+        """Acks the events a closed subscriber has written out."""
+        self._ack([])
+
+    async def wait_ready(self) -> None:
+        """Waits until the subscriber is able to deliver events."""
+
+    async def _process(self, items) -> None:
+        await self.wait_ready()
+        attempts = max(attempts for _, _, attempts, _ in items)
+        LOGGER.debug(f"Subscriber {self.name} processing {len(items)} events")
+        relayed, retracted, closed = self._fold(items)
+        if closed:
+            await self._deliver_digests(closed, attempts)
+        if relayed:
+            await self._deliver_with_retry(
+                self.notify_batch,
+                [event for _, _, _, event in relayed],
+                [seq for _, seq, _, _ in relayed],
+                attempts,
+                len(relayed),
+            )
+        if retracted:
+            await self._deliver_with_retry(
+                self.notify_retractions,
+                [retraction.event for _, _, _, retraction in retracted],
+                [seq for _, seq, _, _ in retracted],
+                attempts,
+                len(retracted),
+                held=False,
+            )
+        self.metrics.record_latency(time.monotonic() - items[0][0])
+
+    async def process_queue(self, batch_size: int, batch_wait: float):
+        while True:
+            if self._parked:
+                try:
+                    self._refill()
+                except Exception as e:
+                    LOGGER.error(f"Error reading outbox for {self.name}: {e}")
+                    await asyncio.sleep(backoff_delay(0))
+                    continue
+            items = await next_batch(self.queue, batch_size, batch_wait)
+            try:
+                await self._process(items)
+            except Exception as e:
+                # the batch stays in the outbox and is delivered after a restart
+                LOGGER.error(
+                    f"Error processing {len(items)} events "
+                    f"for subscriber {self.name}: {e}"
+                )
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    def start(
+        self, batch_size: int, batch_wait: float, outbox: Optional[Outbox] = None
+    ):
+        if outbox is not None:
+            self.outbox = outbox
+        # resume the events left undelivered by a previous run first
+        self._parked = True
+        batch_size = self.batch_size or batch_size
+        batch_wait = self.batch_wait if self.batch_wait is not None else batch_wait
+        self._worker = asyncio.create_task(self.process_queue(batch_size, batch_wait))
+        if self.digest is not None and self.digest.window is not None:
+            self._digest_worker = asyncio.create_task(self.process_digests())
+
+    def stop(self) -> None:
+        """Cancels the workers; undelivered events stay in the outbox."""
+        for worker in (self._worker, self._digest_worker):
+            if worker is not None:
+                worker.cancel()
+
+    async def close(self) -> None:
+        """Releases the subscriber's connections or files."""
+
 
 class DiscordSubscriber(Subscriber):
     _NAME = "discord"
@@ -28,78 +421,286 @@ class DiscordSubscriber(Subscriber):
     def __init__(
         self, channel_id: int, channel: Optional[TextChannel] = None, *args, **kwargs
     ):
-        self.channel = channel
         self.channel_id = int(channel_id)
         self._type = self._NAME
+        # events are held in the queue and outbox until the bot attaches the channel
+        self._channel_ready = asyncio.Event()
+        self.channel = channel
         super().__init__(*args, **kwargs)
 
+    @property
+    def channel(self) -> Optional[TextChannel]:
+        return self._channel
+
+    @channel.setter
+    def channel(self, channel: Optional[TextChannel]) -> None:
+        self._channel = channel
+        if channel is None:
+            self._channel_ready.clear()
+        else:
+            self._channel_ready.set()
+
+    async def wait_ready(self) -> None:
+        await self._channel_ready.wait()
+
+    def _default_key(self) -> str:
+        return f"{self._NAME}:{self.channel_id}"
+
     async def notify(self, event):
-        try:
-            LOGGER.info(f"Sending event #{event.id[:8]} to channel #{self.channel}")
-            embed = create_event_embed(event)
-            await self.channel.send(embed=embed)
-        except Exception as e:
-            LOGGER.error(f"Error in notify: {e}")
+        await self.notify_batch([event])
+
+    async def notify_batch(self, events):
+        embeds = [create_event_embed(event) for event in events]
+        for message_embeds in pack_embeds(embeds):
+            LOGGER.info(
+                f"Sending {len(message_embeds)} events to channel #{self.channel}"
+            )
+            await self._send(embeds=message_embeds)
+            self.metrics.delivered += len(message_embeds)
+
+    async def notify_digests(self, digests: List[EventDigest]):
+        embeds = [create_digest_embed(digest) for digest in digests]
+        for message_embeds in pack_embeds(embeds):
+            LOGGER.info(
+                f"Sending {len(message_embeds)} digests to channel #{self.channel}"
+            )
+            await self._send(embeds=message_embeds)
+        self.metrics.delivered += sum(digest.count for digest in digests)
+
+    async def notify_retractions(self, events):
+        embeds = [create_retraction_embed(event) for event in events]
+        for message_embeds in pack_embeds(embeds):
+            LOGGER.info(
+                f"Sending {len(message_embeds)} retractions to channel #{self.channel}"
+            )
+            await self._send(embeds=message_embeds)
+
+    async def _send(self, embeds):
+        # discord.py paces requests from the X-RateLimit-* response headers and
+        # raises RateLimited when the advertised wait exceeds the bot's
+        # max_ratelimit_timeout, so long waits are slept through here
+        started = time.monotonic()
+        while True:
+            try:
+                message = await self.channel.send(embeds=embeds)
+                break
+            except RateLimited as e:
+                LOGGER.warning(
+                    f"Rate limited on channel #{self.channel}, "
+                    f"retrying in {e.retry_after:.2f}s"
+                )
+                await asyncio.sleep(e.retry_after)
+        metrics.DISCORD_SEND_LATENCY.observe(
+            time.monotonic() - started, subscriber=self.name
+        )
+        return message
 
     @classmethod
     def from_config(cls, config: dict):
         name = config.get("name")
         description = config.get("description")
         channel_id = config.get("channel_id")
+        max_queue_size = config.get("max_queue_size", defaults.SUBSCRIBER_QUEUE_SIZE)
+        digest = config.get("digest")
         return cls(
             name=name,
             description=description,
             channel_id=channel_id,
+            max_queue_size=max_queue_size,
+            digest=Digester.from_config(digest) if digest else None,
+            route=SubscriptionRoute.from_config(config),
+            max_delivery_retries=config.get(
+                "max_delivery_retries", defaults.DELIVERY_MAX_RETRIES
+            ),
+            key=config.get("key"),
         )
 
 
 class SubscriptionManager:
-    def __init__(self, event_queue: Queue, subscribers: List[DiscordSubscriber]):
-        self.subscriptions = {}
+    def __init__(
+        self,
+        event_queue: Queue,
+        subscribers: List[DiscordSubscriber],
+        batch_size: int = defaults.PUBLISH_BATCH_SIZE,
+        batch_wait: float = defaults.PUBLISH_BATCH_WAIT,
+        outbox: Optional[Outbox] = None,
+        on_progress: Optional[Callable[[ScanProgress], None]] = None,
+    ):
+        # (chain id, address, event name) -> {subscriber: args predicate}
+        self.subscriptions: Dict[DispatchKey, Dict[Subscriber, Optional[Callable]]]
+        self.subscriptions = defaultdict(dict)
         self.event_queue = event_queue
-        self.subscribers = subscribers
+        self.subscribers = []
+        for subscriber in subscribers:
+            self._check_key(subscriber)
+            self.subscribers.append(subscriber)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        # undelivered events of every subscriber, written before they are queued
+        self.outbox = outbox or MemoryOutbox()
+        self._task = None
+        # commits scan checkpoints once the events before them are stored
+        self.on_progress = on_progress
 
     @classmethod
     def from_config(
-        cls, event_queue: Queue, config: PiqueConfig
+        cls,
+        event_queue: Queue,
+        config: PiqueConfig,
+        sinks: Optional[List[Subscriber]] = None,
+        outbox: Optional[Outbox] = None,
+        on_progress: Optional[Callable[[ScanProgress], None]] = None,
     ) -> "SubscriptionManager":
-        subscribers_data, subscribers = list(), list()
-        discord_subscribers_data = config.discord.subscribers
-        subscribers_data.extend(discord_subscribers_data)
-        for subscriber_data in subscribers_data:
-            # TODO: Add more subscriber types and make this more generic
-            subscriber = DiscordSubscriber.from_config(subscriber_data)
-            subscribers.append(subscriber)
-        return cls(event_queue=event_queue, subscribers=subscribers)
+        subscribers = [
+            DiscordSubscriber.from_config(subscriber_data)
+            for subscriber_data in config.discord.subscribers
+        ]
+        manager = cls(
+            event_queue=event_queue,
+            subscribers=subscribers + list(sinks or []),
+            batch_size=config.discord.batch_size,
+            batch_wait=config.discord.batch_wait,
+            outbox=outbox,
+            on_progress=on_progress,
+        )
+        # routed up front so events scanned before the bot connects are kept
+        for subscriber in manager.subscribers:
+            manager.route(config.events, subscriber)
+        return manager
 
-    async def notify(self, event):
-        try:
-            if event.name not in self.subscriptions:
-                return
-            LOGGER.debug(f"Found {len(self.subscriptions[event.name])} subscribers")
-            for subscriber in self.subscriptions[event.name]:
-                LOGGER.debug(f"Sending event #{event.id[:8]} to subscribers")
-                await subscriber.notify(event)
-        except Exception as e:
-            LOGGER.error(f"Error in notify: {e}")
+    def _targets(self, event) -> List[Subscriber]:
+        key = dispatch_key(event.chain_id, event.contract_address, event.name)
+        subscribers = self.subscriptions.get(key)
+        if not subscribers:
+            return []
+        return [
+            subscriber
+            for subscriber, predicate in subscribers.items()
+            if predicate is None or predicate(event.args)
+        ]
+
+    async def notify(self, events):
+        """
+        Records events in the outbox with one write, then fans them out to
+        the queues of their subscribers. Subscribers with a full queue are
+        skipped and read the events back from the outbox.
+        """
+        deliveries = []
+        for event in events:
+            # retractions go to the subscribers of the retracted event
+            routed = event.event if isinstance(event, Retraction) else event
+            try:
+                targets = self._targets(routed)
+            except Exception as e:
+                LOGGER.error(f"Error routing event #{routed.id[:8]}: {e}")
+                continue
+            if targets:
+                deliveries.append((event, targets))
+        if not deliveries:
+            return
+        seqs = await self._store(
+            [(event, [t.key for t in targets]) for event, targets in deliveries]
+        )
+        for seq, (event, targets) in zip(seqs, deliveries):
+            for subscriber in targets:
+                subscriber.offer(event, seq=seq)
+
+    async def _store(self, deliveries) -> List[int]:
+        """Writes to the outbox, retrying until the write succeeds."""
+        attempt = 0
+        while True:
+            try:
+                return self.outbox.add(deliveries)
+            except Exception as e:
+                delay = backoff_delay(attempt)
+                attempt += 1
+                LOGGER.error(
+                    f"Error storing {len(deliveries)} events in the outbox ({e}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
 
     async def process_queue(self):
         while True:
-            event = await self.event_queue.get()
-            LOGGER.debug(f"Processing event #{event.id[:8]}")
-            await self.notify(event)
-            self.event_queue.task_done()
-            await asyncio.sleep(_throttle.PUBLISHER)
+            items = await next_batch(
+                self.event_queue, defaults.OUTBOX_BATCH_SIZE, batch_wait=0
+            )
+            events = [item for item in items if not isinstance(item, ScanProgress)]
+            LOGGER.debug(f"Processing {len(events)} events")
+            try:
+                await self.notify(events)
+            except Exception as e:
+                LOGGER.error(f"Error in notify: {e}")
+            # the events queued before each checkpoint are now in the outbox
+            for item in items:
+                if isinstance(item, ScanProgress) and self.on_progress is not None:
+                    try:
+                        self.on_progress(item)
+                    except Exception as e:
+                        LOGGER.error(f"Error committing scan progress: {e}")
+            for _ in items:
+                self.event_queue.task_done()
 
     def start(self):
-        asyncio.create_task(self.process_queue())
+        for subscriber in self.subscribers:
+            subscriber.start(
+                batch_size=self.batch_size,
+                batch_wait=self.batch_wait,
+                outbox=self.outbox,
+            )
+        self._task = asyncio.create_task(self.process_queue())
 
-    def subscribe(self, event, subscriber):
-        if event not in self.subscriptions:
-            self.subscriptions[event.name] = []
-        self.subscriptions[event.name].append(subscriber)
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        for subscriber in self.subscribers:
+            subscriber.stop()
+        for subscriber in self.subscribers:
+            try:
+                await subscriber.close()
+                subscriber.ack_flushed()
+            except Exception as e:
+                LOGGER.error(f"Error closing subscriber {subscriber.name}: {e}")
+        self.outbox.close()
+
+    def _check_key(self, subscriber: Subscriber) -> None:
+        # outbox deliveries are keyed by subscriber, so keys must be unique
+        for other in self.subscribers:
+            if other.key == subscriber.key:
+                message = (
+                    f"subscribers {other.name} and {subscriber.name} share the "
+                    f"outbox key {subscriber.key}; set a distinct `key` on one of them"
+                )
+                LOGGER.error(message)
+                raise ValueError(message)
+
+    def add_subscriber(self, subscriber: Subscriber) -> None:
+        """Adds and starts a subscriber at runtime."""
+        self._check_key(subscriber)
+        self.subscribers.append(subscriber)
+        subscriber.start(
+            batch_size=self.batch_size, batch_wait=self.batch_wait, outbox=self.outbox
+        )
+
+    def subscribe(self, event, subscriber, predicate: Optional[Callable] = None):
+        key = dispatch_key(event.chain_id, event.address, event.name)
+        self.subscriptions[key][subscriber] = predicate
 
     def unsubscribe(self, event, subscriber):
-        if event not in self.subscriptions:
+        key = dispatch_key(event.chain_id, event.address, event.name)
+        subscribers = self.subscriptions.get(key)
+        if subscribers is None:
             return
-        self.subscriptions[event.name].remove(subscriber)
+        subscribers.pop(subscriber, None)
+        if not subscribers:
+            del self.subscriptions[key]
+
+    def route(self, events, subscriber) -> int:
+        """Subscribes a subscriber to the tracked events its route selects."""
+        routed = [event for event in events if subscriber.route.matches(event)]
+        subscriber.route.check_filters(routed)
+        for event in routed:
+            predicate = subscriber.route.predicate(event)
+            self.subscribe(event=event, subscriber=subscriber, predicate=predicate)
+        LOGGER.info(f"Routed {len(routed)} events to subscriber {subscriber.name}")
+        return len(routed)
@@ -17,7 +17,7 @@ setup(
     author='Kieran Prasch',
     author_email='kieranprasch@gmail.com',
     description='A [discord] bot for relaying Web3 events',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks']),
     install_requires=requirements,
     py_modules=['pique'],
     entry_points={
@@ -0,0 +1,78 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from eth_utils import keccak
+
+from benchmarks.fakes import FakeNode, TOKEN_ADDRESS
+from pique.config import ChainConfig
+from pique.providers import close_providers, make_provider
+from pique.scanner.events import Event, _load_config_events
+
+ABI_FILEPATH = str(
+    Path(__file__).parent.parent / "examples/erc20_transfer/abis/ERC20-Transfer.json"
+)
+
+
+def make_event(block_number: int, log_index: int = 0, value: int = 1) -> Event:
+    return Event(
+        contract_name="Token",
+        color=0,
+        description="",
+        chain_id=1,
+        event_type="Transfer",
+        log_index=log_index,
+        tx_index=log_index,
+        tx_hash=keccak(block_number.to_bytes(8, "big")),
+        contract_address=TOKEN_ADDRESS,
+        block_hash=keccak(text=str(block_number)),
+        block_number=block_number,
+        args={"from": TOKEN_ADDRESS, "to": TOKEN_ADDRESS, "value": value},
+    )
+
+
+async def wait_for(condition, timeout: float = 5) -> None:
+    """Polls `condition` until it holds, failing the test after `timeout`."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def node():
+    node = FakeNode(head=1000, density=2)
+    node.url = await node.start()
+    yield node
+    await node.stop()
+
+
+@pytest.fixture
+async def make_events(node):
+    """
+    Builds the tracked Transfer events of the fake node's token, with their
+    own providers, as a freshly started process would.
+    """
+    opened = []
+
+    def make_events(chain_id: int = 1):
+        chain_config = ChainConfig.from_dict(
+            chain_id, {"providers": [{"url": node.url}]}
+        )
+        providers = {chain_id: make_provider(chain_config.providers, chain_config)}
+        contracts = [
+            {
+                "name": "Token",
+                "address": TOKEN_ADDRESS,
+                "chain_id": chain_id,
+                "abi_file": ABI_FILEPATH,
+                "events": ["Transfer"],
+            }
+        ]
+        opened.append(providers)
+        return _load_config_events(contracts, providers=providers), providers
+
+    yield make_events
+    for providers in opened:
+        await close_providers(providers)
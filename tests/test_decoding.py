@@ -0,0 +1,145 @@
+import pytest
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic, keccak, to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+
+from benchmarks.fakes import FakeNode
+from pique._utils import _read_abi
+from pique.scanner.decoding import EventDecoder, compile_filters, compile_predicate
+from tests.conftest import ABI_FILEPATH
+
+TRANSFER_ABI = _read_abi(ABI_FILEPATH)[0]
+OWNER = to_checksum_address("0x" + "ab" * 20)
+ACCOUNT = to_checksum_address("0x" + "cd" * 20)
+
+COMPLEX_ABI = {
+    "anonymous": False,
+    "name": "Complex",
+    "type": "event",
+    "inputs": [
+        {"indexed": True, "name": "tag", "type": "string"},
+        {"indexed": True, "name": "owner", "type": "address"},
+        {"indexed": False, "name": "amounts", "type": "uint256[]"},
+        {
+            "indexed": False,
+            "name": "entry",
+            "type": "tuple",
+            "components": [
+                {"name": "account", "type": "address"},
+                {"name": "weight", "type": "uint64"},
+            ],
+        },
+        {"indexed": False, "name": "id", "type": "bytes32"},
+        {"indexed": False, "name": "flag", "type": "bool"},
+    ],
+}
+
+
+def _complex_log():
+    data = encode(
+        ["uint256[]", "(address,uint64)", "bytes32", "bool"],
+        [[1, 2, 3], (ACCOUNT, 7), b"\x01" * 32, True],
+    )
+    return {
+        "address": OWNER,
+        "blockHash": HexBytes("0x" + "11" * 32),
+        "blockNumber": 1,
+        "transactionHash": HexBytes("0x" + "22" * 32),
+        "transactionIndex": 0,
+        "logIndex": 0,
+        "topics": [
+            HexBytes(event_abi_to_log_topic(COMPLEX_ABI)),
+            HexBytes(keccak(text="hello")),
+            HexBytes(encode(["address"], [OWNER])),
+        ],
+        "data": HexBytes(data),
+    }
+
+
+def _web3_args(event_abi, log):
+    contract = Web3().eth.contract(abi=[event_abi])
+    event = getattr(contract.events, event_abi["name"])()
+    return _plain(event.process_log(log)["args"])
+
+
+def _plain(value):
+    if hasattr(value, "items"):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def test_decoder_matches_web3_for_transfers():
+    decoder = EventDecoder(TRANSFER_ABI)
+    for raw in FakeNode(density=3).get_logs(1, 5):
+        log = dict(raw, topics=[HexBytes(t) for t in raw["topics"]])
+        assert decoder.decode_args(log) == _web3_args(TRANSFER_ABI, log)
+
+
+def test_decoder_matches_web3_for_arrays_structs_and_hashed_topics():
+    log = _complex_log()
+    args = EventDecoder(COMPLEX_ABI).decode_args(log)
+    assert _plain(args) == _web3_args(COMPLEX_ABI, log)
+    assert args["entry"] == {"account": ACCOUNT, "weight": 7}
+    assert args["tag"] == HexBytes(keccak(text="hello"))
+
+
+def test_decoder_rejects_missing_topics():
+    log = _complex_log()
+    log["topics"] = log["topics"][:2]
+    with pytest.raises(ValueError):
+        EventDecoder(COMPLEX_ABI).decode_args(log)
+
+
+def test_indexed_filters_compile_to_topics():
+    sender = "0x" + "ab" * 20  # not checksummed
+    topics, predicate = compile_filters(TRANSFER_ABI, {"from": sender})
+    assert topics == [
+        HexBytes(event_abi_to_log_topic(TRANSFER_ABI)).hex(),
+        [HexBytes(encode(["address"], [OWNER])).hex()],
+    ]
+    assert predicate is None
+
+
+def test_trailing_unfiltered_topics_are_dropped_and_gaps_kept():
+    topics, _ = compile_filters(TRANSFER_ABI, {"to": [OWNER, ACCOUNT]})
+    assert len(topics) == 3
+    assert topics[1] is None
+    assert len(topics[2]) == 2
+
+
+def test_data_filters_compile_to_a_predicate():
+    topics, predicate = compile_filters(TRANSFER_ABI, {"value": ["0x10", 20]})
+    assert topics is None
+    assert predicate({"value": 16})
+    assert predicate({"value": 20})
+    assert not predicate({"value": 21})
+
+
+def test_indexed_dynamic_values_are_matched_by_hash():
+    topics, _ = compile_filters(COMPLEX_ABI, {"tag": "hello"})
+    assert topics[1] == [HexBytes(keccak(text="hello")).hex()]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("false", False), ("False", False), ("0", False), ("true", True), (1, True)],
+)
+def test_bool_filters_parse_strings(value, expected):
+    predicate = compile_predicate(COMPLEX_ABI, {"flag": value})
+    assert predicate({"flag": expected})
+    assert not predicate({"flag": not expected})
+
+
+def test_invalid_filters_raise():
+    with pytest.raises(ValueError):
+        compile_filters(TRANSFER_ABI, {"amount": 1})
+    with pytest.raises(ValueError):
+        compile_predicate(COMPLEX_ABI, {"flag": "maybe"})
+
+
+def test_no_filters_compile_to_nothing():
+    assert compile_filters(TRANSFER_ABI, None) == (None, None)
+    assert compile_predicate(TRANSFER_ABI, {}) is None
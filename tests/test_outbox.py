@@ -0,0 +1,244 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import TOKEN_ADDRESS
+from pique import subscriptions
+from pique.digest import Digester
+from pique.outbox import MemoryOutbox, SQLiteOutbox
+from pique.scanner.reorgs import Retraction
+from pique.subscriptions import (
+    PermanentDeliveryError,
+    Subscriber,
+    SubscriptionManager,
+)
+from tests.conftest import make_event, wait_for
+
+TRANSFERS = SimpleNamespace(chain_id=1, address=TOKEN_ADDRESS, name="Transfer")
+
+
+class RecordingSubscriber(Subscriber):
+    """Records delivered events, failing the first `failures` deliveries."""
+
+    def __init__(self, name: str, failures: int = 0, delay: float = 0, **kwargs):
+        super().__init__(name=name, description="", **kwargs)
+        self.failures = failures
+        self.delay = delay
+        self.error = ConnectionError
+        self.delivered = []
+
+    async def notify(self, event):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise self.error("delivery failed")
+        self.delivered.append(event.block_number)
+
+    async def notify_digests(self, digests):
+        pass
+
+    async def notify_retractions(self, events):
+        pass
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def outbox(request, tmp_path):
+    if request.param == "memory":
+        outbox = MemoryOutbox()
+    else:
+        outbox = SQLiteOutbox(str(tmp_path / "outbox.db"))
+    yield outbox
+    outbox.close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(subscriptions, "backoff_delay", lambda attempt: 0)
+
+
+@pytest.fixture
+async def make_manager():
+    managers = []
+
+    def make_manager(outbox, *subscribers) -> SubscriptionManager:
+        manager = SubscriptionManager(
+            event_queue=asyncio.Queue(),
+            subscribers=list(subscribers),
+            batch_size=10,
+            batch_wait=0,
+            outbox=outbox,
+        )
+        for subscriber in subscribers:
+            manager.subscribe(event=TRANSFERS, subscriber=subscriber)
+        managers.append(manager)
+        return manager
+
+    yield make_manager
+    for manager in managers:
+        await manager.close()
+
+
+def test_events_are_kept_until_every_subscriber_acks(outbox):
+    seqs = outbox.add([(make_event(1), ["a", "b"]), (make_event(2), ["a"])])
+    assert outbox.count() == 3
+
+    outbox.ack("a", seqs)
+    assert outbox.pending("a") == []
+    [(seq, attempts, event)] = outbox.pending("b")
+    assert (seq, attempts, event.block_number) == (seqs[0], 0, 1)
+
+    outbox.ack("b", seqs[:1])
+    assert outbox.count() == 0
+
+
+def test_pending_reads_from_a_seq_with_a_limit(outbox):
+    seqs = outbox.add([(make_event(n), ["a"]) for n in range(5)])
+    pending = outbox.pending("a", after_seq=seqs[1], limit=2)
+    assert [seq for seq, _, _ in pending] == seqs[2:4]
+
+
+def test_retries_are_counted_and_failures_dropped(outbox):
+    seqs = outbox.add([(make_event(1), ["a"]), (make_event(2), ["a"])])
+    outbox.retry("a", seqs[:1], attempts=3)
+    outbox.fail("a", seqs[1:])
+    assert [(seq, attempts) for seq, attempts, _ in outbox.pending("a")] == [
+        (seqs[0], 3)
+    ]
+    assert outbox.count() == 1
+
+
+def test_sqlite_outbox_survives_a_restart(tmp_path):
+    filepath = str(tmp_path / "outbox.db")
+    outbox = SQLiteOutbox(filepath)
+    seqs = outbox.add([(make_event(1), ["a"]), (make_event(2), ["a"])])
+    outbox.ack("a", seqs[:1])
+    outbox.close()
+
+    outbox = SQLiteOutbox(filepath)
+    [(seq, _, event)] = outbox.pending("a")
+    assert (seq, event.id) == (seqs[1], make_event(2).id)
+    assert outbox.add([(make_event(3), ["a"])]) == [seqs[1] + 1]
+    outbox.close()
+
+
+async def test_delivered_events_are_acked(outbox, make_manager):
+    subscriber = RecordingSubscriber("a")
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    for n in range(25):
+        await manager.event_queue.put(make_event(n))
+    await wait_for(lambda: len(subscriber.delivered) == 25)
+    assert subscriber.delivered == list(range(25))
+    await wait_for(lambda: outbox.count() == 0)
+
+
+async def test_failed_deliveries_are_retried(outbox, make_manager):
+    subscriber = RecordingSubscriber("a", failures=2)
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    await manager.event_queue.put(make_event(1))
+    await wait_for(lambda: subscriber.delivered == [1])
+    assert subscriber.metrics.failed == 0
+    await wait_for(lambda: outbox.count() == 0)
+
+
+async def test_deliveries_are_given_up_after_max_retries(outbox, make_manager):
+    subscriber = RecordingSubscriber("a", failures=10, max_delivery_retries=2)
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    await manager.event_queue.put(make_event(1))
+    await wait_for(lambda: subscriber.metrics.failed == 1)
+    assert subscriber.failures == 7  # the first attempt and two retries
+    assert outbox.pending("a") == []
+
+
+async def test_rejected_deliveries_are_failed_at_once(outbox, make_manager):
+    subscriber = RecordingSubscriber("a", failures=10)
+    subscriber.error = PermanentDeliveryError
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    await manager.event_queue.put(make_event(1))
+    await wait_for(lambda: subscriber.metrics.failed == 1)
+    assert subscriber.failures == 9
+    assert outbox.pending("a") == []
+
+
+async def test_folded_events_are_acked_once_folded(outbox, make_manager):
+    digester = Digester(window=None, max_events=100)
+    subscriber = RecordingSubscriber("a", digest=digester)
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    for n in range(10):
+        await manager.event_queue.put(make_event(n))
+    await wait_for(lambda: sum(d.count for d in digester.digests.values()) == 10)
+    assert outbox.count() == 0
+    assert subscriber.delivered == []
+
+
+async def test_undelivered_events_are_recovered_on_start(tmp_path, make_manager):
+    filepath = str(tmp_path / "outbox.db")
+    outbox = SQLiteOutbox(filepath)
+    outbox.add([(make_event(n), ["a"]) for n in range(3)])
+    outbox.close()
+
+    outbox = SQLiteOutbox(filepath)
+    subscriber = RecordingSubscriber("a")
+    make_manager(outbox, subscriber).start()
+    await wait_for(lambda: subscriber.delivered == [0, 1, 2])
+    await wait_for(lambda: outbox.count() == 0)
+
+
+async def test_a_full_subscriber_does_not_block_the_others(outbox, make_manager):
+    slow = RecordingSubscriber("slow", delay=0.01, max_queue_size=2)
+    fast = RecordingSubscriber("fast")
+    manager = make_manager(outbox, slow, fast)
+    manager.start()
+    for n in range(30):
+        await manager.event_queue.put(make_event(n))
+    await wait_for(lambda: len(fast.delivered) == 30)
+    assert len(slow.delivered) < 30
+    assert slow.metrics.parked > 0
+    await wait_for(lambda: len(slow.delivered) == 30)
+    assert slow.delivered == list(range(30))
+
+
+async def test_a_failing_batch_does_not_stop_the_worker(outbox, make_manager):
+    subscriber = RecordingSubscriber("a")
+    errors = [RuntimeError("not ready")]
+
+    async def wait_ready():
+        if errors:
+            raise errors.pop()
+
+    subscriber.wait_ready = wait_ready
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    await manager.event_queue.put(make_event(1))
+    await wait_for(lambda: not errors)
+    await manager.event_queue.put(make_event(2))
+    await wait_for(lambda: subscriber.delivered == [2])
+
+
+async def test_retractions_are_not_held_behind_buffered_events(outbox, make_manager):
+    class BufferingSubscriber(RecordingSubscriber):
+        buffered = 1
+
+    subscriber = BufferingSubscriber("a")
+    manager = make_manager(outbox, subscriber)
+    manager.start()
+    await manager.event_queue.put(make_event(1))
+    await wait_for(lambda: subscriber.delivered == [1])
+    await manager.event_queue.put(Retraction(make_event(2)))
+    await wait_for(lambda: outbox.count() == 1)
+    [(_, _, event)] = outbox.pending("a")
+    assert event.block_number == 1
+
+
+def test_subscribers_sharing_an_outbox_key_are_rejected():
+    with pytest.raises(ValueError):
+        SubscriptionManager(
+            event_queue=asyncio.Queue(),
+            subscribers=[RecordingSubscriber("a"), RecordingSubscriber("a")],
+        )
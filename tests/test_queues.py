@@ -0,0 +1,17 @@
+import pytest
+
+from pique.queues import OVERFLOW_SPILL, make_event_queue
+
+
+async def test_spilled_items_keep_their_order():
+    queue = make_event_queue(max_size=2, overflow=OVERFLOW_SPILL)
+    for n in range(5):
+        queue.put_nowait(n)
+    assert queue.spilled == 3
+    assert [queue.get_nowait() for _ in range(5)] == list(range(5))
+
+
+@pytest.mark.parametrize("max_size", [0, -1])
+def test_spilling_needs_a_bounded_queue(max_size):
+    with pytest.raises(ValueError):
+        make_event_queue(max_size=max_size, overflow=OVERFLOW_SPILL)
@@ -0,0 +1,9 @@
+import asyncio
+
+from pique.ratelimit import TokenBucket
+
+
+async def test_rates_below_one_per_second_still_acquire():
+    bucket = TokenBucket(rate=0.5)
+    await asyncio.wait_for(bucket.acquire(), timeout=1)
+    assert bucket.capacity == 1
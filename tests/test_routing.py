@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from eth_utils import keccak
+from hexbytes import HexBytes
+
+from benchmarks.fakes import TOKEN_ADDRESS
+from pique._utils import _read_abi
+from pique.subscriptions import SubscriptionManager, SubscriptionRoute
+from tests.conftest import ABI_FILEPATH
+from tests.test_decoding import COMPLEX_ABI
+from tests.test_outbox import RecordingSubscriber
+
+
+def _container(abi):
+    return SimpleNamespace(
+        chain_id=1,
+        address=TOKEN_ADDRESS,
+        contract_name="Token",
+        name=abi["name"],
+        abi=abi,
+    )
+
+
+TRANSFERS = _container(_read_abi(ABI_FILEPATH)[0])
+COMPLEX = _container(COMPLEX_ABI)
+
+
+def _route(**filters) -> SubscriptionRoute:
+    return SubscriptionRoute(filters=filters)
+
+
+def test_filters_apply_to_the_events_that_have_the_argument():
+    manager = SubscriptionManager(event_queue=asyncio.Queue(), subscribers=[])
+    subscriber = RecordingSubscriber("a", route=_route(value=1))
+    assert manager.route([TRANSFERS, COMPLEX], subscriber) == 2
+
+
+def test_filters_no_routed_event_has_are_rejected():
+    manager = SubscriptionManager(event_queue=asyncio.Queue(), subscribers=[])
+    subscriber = RecordingSubscriber("a", route=_route(amount=1))
+    with pytest.raises(ValueError):
+        manager.route([TRANSFERS, COMPLEX], subscriber)
+
+
+def test_indexed_dynamic_filters_match_the_decoded_hash():
+    predicate = _route(tag="hello").predicate(COMPLEX)
+    assert predicate({"tag": HexBytes(keccak(text="hello"))})
+    assert not predicate({"tag": HexBytes(keccak(text="other"))})
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from pique.scanner.checkpoints import ScanProgress, load_checkpoint_store
+from pique.scanner.dedup import load_deduplicator
+from pique.scanner.scanner import EventScanner
+
+
+@pytest.fixture
+def make_scanner(make_events, tmp_path):
+    filepath = str(tmp_path / "pique.db")
+
+    def make_scanner(start_block="latest", **kwargs):
+        events, providers = make_events()
+        return EventScanner(
+            events=events,
+            providers=providers,
+            batch_size=20,
+            start_block=start_block,
+            loop_interval=1,
+            rate_limit=100000,
+            checkpoints=load_checkpoint_store(filepath),
+            deduplicator=load_deduplicator(1000, filepath=filepath),
+            queue=asyncio.Queue(),
+            **kwargs,
+        )
+
+    return make_scanner
+
+
+def drain(scanner: EventScanner, commit: bool = True) -> list:
+    """
+    Takes the queued events, committing the scan progress behind them as the
+    subscription manager does once they are in the outbox.
+    """
+    events = []
+    while not scanner.queue.empty():
+        item = scanner.queue.get_nowait()
+        if isinstance(item, ScanProgress):
+            if commit:
+                scanner.commit_progress(item)
+        else:
+            events.append(item)
+    return events
+
+
+async def test_scans_from_the_start_block(node, make_scanner):
+    scanner = make_scanner(start_block=991)
+    await scanner.check_web3_events()
+    events = drain(scanner)
+    assert len(events) == 10 * node.density
+    assert [e.block_number for e in events] == sorted(e.block_number for e in events)
+    assert events[0].block_number == 991
+    assert events[-1].block_number == 1000
+    assert events[0].timestamp.timestamp() == 1700000000 + 991 * 12
+
+
+async def test_resumes_from_the_committed_checkpoint(node, make_scanner):
+    scanner = make_scanner(start_block=991)
+    await scanner.check_web3_events()
+    drain(scanner)
+
+    node.mine(5)
+    restarted = make_scanner(start_block="latest")
+    await restarted.check_web3_events()
+    blocks = {event.block_number for event in drain(restarted)}
+    assert blocks == set(range(1001, 1006))
+
+
+async def test_uncommitted_progress_is_scanned_again(node, make_scanner):
+    scanner = make_scanner(start_block=991)
+    await scanner.check_web3_events()
+    drain(scanner, commit=False)  # crashed before the events reached the outbox
+
+    node.mine(5)
+    restarted = make_scanner(start_block=991)
+    await restarted.check_web3_events()
+    blocks = {event.block_number for event in drain(restarted)}
+    assert blocks == set(range(991, 1006))
+
+
+async def test_backfill_after_a_restart_is_bounded(node, make_scanner):
+    scanner = make_scanner(start_block=991)
+    await scanner.check_web3_events()
+    drain(scanner)
+
+    node.mine(100)
+    restarted = make_scanner(start_block="latest", max_backfill=10)
+    await restarted.check_web3_events()
+    blocks = {event.block_number for event in drain(restarted)}
+    assert blocks == set(range(1091, 1101))
+
+
+async def test_a_provider_on_another_chain_is_never_scanned(node, make_scanner):
+    node.chain_id = 137
+    scanner = make_scanner(start_block=991)
+    for _ in range(2):
+        await scanner.check_web3_events()
+        assert drain(scanner) == []
+    assert "eth_getLogs" not in node.requests
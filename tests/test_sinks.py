@@ -0,0 +1,246 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from pique.constants import defaults
+from pique.digest import Digester
+from pique.sinks import FileSubscriber, StreamSubscriber, WebhookSubscriber, load_sinks
+from pique.subscriptions import DeliveryError, PermanentDeliveryError
+from tests.conftest import make_event
+
+EVENTS = [make_event(n, value=n) for n in range(1, 6)]
+
+
+def _digest(count: int):
+    digester = Digester(window=None, max_events=count)
+    for event in EVENTS[:count]:
+        digest = digester.add(event)
+    return digest
+
+
+class WebhookServer:
+    """Records posted bodies, answering the first `failures` with `status`."""
+
+    def __init__(self, failures: int = 0, status: int = 503):
+        self.failures = failures
+        self.status = status
+        self.bodies = []
+        self.headers = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.headers.append(request.headers)
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=self.status)
+        self.bodies.append(await request.json())
+        return web.Response(status=204)
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+
+class StreamServer:
+    """Redis stand-in that records commands, dropping the first `drops` connections."""
+
+    def __init__(self, drops: int = 0):
+        self.drops = drops
+        self.commands = []
+
+    async def handle(self, reader, writer) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            parts = []
+            for _ in range(int(line[1:])):
+                size = int((await reader.readline())[1:])
+                parts.append((await reader.readexactly(size + 2))[:-2].decode())
+            if self.drops:
+                self.drops -= 1
+                break
+            self.commands.append(parts)
+            writer.write(b"$3\r\n1-0\r\n")
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def webhook():
+    servers = []
+
+    async def webhook(**kwargs):
+        server = WebhookServer(**kwargs)
+        servers.append(server)
+        return server, await server.start()
+
+    yield webhook
+    for server in servers:
+        await server.runner.cleanup()
+
+
+@pytest.fixture
+async def stream(tmp_path):
+    servers = []
+
+    async def stream(**kwargs):
+        server = StreamServer(**kwargs)
+        path = str(tmp_path / f"stream-{len(servers)}.sock")
+        servers.append(await asyncio.start_unix_server(server.handle, path=path))
+        return server, f"unix://{path}"
+
+    yield stream
+    for server in servers:
+        server.close()
+
+
+async def test_webhook_posts_records(webhook):
+    server, url = await webhook()
+    sink = WebhookSubscriber(
+        url=url, headers={"Authorization": "token"}, name="hook", description=""
+    )
+    await sink.notify_batch(EVENTS[:2])
+    await sink.notify_digests([_digest(3)])
+    await sink.notify_retractions(EVENTS[:1])
+    await sink.close()
+
+    events, digests, retractions = server.bodies
+    assert [record["id"] for record in events] == [e.id for e in EVENTS[:2]]
+    assert events[1]["args"]["value"] == 2
+    assert digests[0]["type"] == "digest"
+    assert digests[0]["count"] == 3
+    assert retractions == [{"type": "retraction", **EVENTS[0].to_dict()}]
+    assert server.headers[0]["Authorization"] == "token"
+    assert sink.metrics.delivered == 5
+
+
+async def test_webhook_leaves_retrying_server_errors_to_the_outbox(webhook):
+    server, url = await webhook(failures=1)
+    sink = WebhookSubscriber(url=url, name="hook", description="")
+    with pytest.raises(DeliveryError):
+        await sink.notify_batch(EVENTS[:1])
+    await sink.notify_batch(EVENTS[:1])
+    await sink.close()
+    assert len(server.headers) == 2
+    assert len(server.bodies) == 1
+
+
+async def test_webhook_client_errors_are_permanent(webhook):
+    server, url = await webhook(failures=1, status=400)
+    sink = WebhookSubscriber(url=url, name="hook", description="")
+    with pytest.raises(PermanentDeliveryError):
+        await sink.notify_batch(EVENTS[:1])
+    await sink.close()
+    assert server.bodies == []
+
+
+async def test_file_appends_json_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    [sink] = load_sinks([{"type": "file", "path": str(path)}])
+    await sink.notify_batch(EVENTS)
+    await sink.notify_retractions(EVENTS[:1])
+    await sink.close()
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["block_number"] for record in records[:5]] == [1, 2, 3, 4, 5]
+    assert records[5]["type"] == "retraction"
+
+
+async def test_parquet_row_groups_are_written_as_complete_files(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "events.parquet"
+    sink = FileSubscriber(
+        path=str(path), format="parquet", row_group_size=2, name="pq", description=""
+    )
+    await sink.notify_batch(EVENTS[:1])
+    assert sink.buffered == 1  # held back from the outbox ack until written
+    await sink.notify_batch(EVENTS[1:3])
+    assert sink.buffered == 0
+    await sink.notify_batch(EVENTS[3:4])
+    await sink.close()
+
+    files = [path, tmp_path / "events-1.parquet"]
+    assert sorted(tmp_path.glob("events*.parquet")) == sorted(files)
+    tables = [parquet.read_table(f).to_pylist() for f in files]
+    assert [[row["block_number"] for row in table] for table in tables] == [
+        [1, 2, 3],
+        [4],
+    ]
+    rows = tables[0]
+    assert json.loads(rows[0]["args"])["to"] == EVENTS[0].args["to"]
+
+
+def test_parquet_rejects_digests(tmp_path):
+    with pytest.raises(ValueError):
+        load_sinks(
+            [
+                {
+                    "type": "file",
+                    "path": str(tmp_path / "events.parquet"),
+                    "format": "parquet",
+                    "digest": {"max_events": 10},
+                }
+            ]
+        )
+
+
+async def test_stream_pipelines_xadd_commands(stream):
+    server, url = await stream()
+    sink = StreamSubscriber(url=url, maxlen=100, name="stream", description="")
+    await sink.notify_batch(EVENTS[:3])
+    await sink.notify_digests([_digest(2)])
+    await sink.close()
+
+    assert len(server.commands) == 4
+    command = server.commands[0]
+    assert command[:6] == ["XADD", defaults.STREAM_NAME, "MAXLEN", "~", "100", "*"]
+    assert command[6] == "event"
+    assert json.loads(command[7])["id"] == EVENTS[0].id
+    assert server.commands[3][6] == "digest"
+
+
+async def test_stream_reconnects_after_a_dropped_connection(stream):
+    server, url = await stream(drops=1)
+    sink = StreamSubscriber(url=url, name="stream", description="")
+    with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+        await sink.notify_batch(EVENTS[:2])
+    await sink.notify_batch(EVENTS[:2])
+    await sink.close()
+    assert [json.loads(c[-1])["block_number"] for c in server.commands] == [1, 2]
+
+
+async def test_stream_writes_json_lines(tmp_path):
+    path = str(tmp_path / "lines.sock")
+    received = []
+
+    async def handle(reader, writer):
+        async for line in reader:
+            received.append(json.loads(line))
+
+    server = await asyncio.start_unix_server(handle, path=path)
+    sink = StreamSubscriber(
+        url=f"unix://{path}", protocol="jsonl", name="lines", description=""
+    )
+    await sink.notify_batch(EVENTS[:2])
+    await sink.close()
+    await asyncio.sleep(0.05)
+    server.close()
+    assert [record["block_number"] for record in received] == [1, 2]
+
+
+def test_sinks_get_distinct_outbox_keys(tmp_path):
+    loaded = load_sinks(
+        [
+            {"type": "webhook", "url": "http://localhost:1/a"},
+            {"type": "webhook", "url": "http://localhost:1/b"},
+            {"type": "file", "path": str(tmp_path / "a.jsonl")},
+        ]
+    )
+    assert len({sink.key for sink in loaded}) == 3